@@ -0,0 +1,214 @@
+import sys
+import time
+import heapq
+import random
+
+
+class CollisionEngine:
+    """一维 N 方块弹性碰撞引擎
+
+    方块按位置从左到右排列，只有相邻方块之间或最外侧方块与墙壁之间会碰撞。
+    所有可能的下一次碰撞放在按时间排序的优先队列里，
+    方块速度改变时只把它的版本号加一，旧事件出队时发现版本不符直接丢弃（惰性作废），
+    因此每个事件的代价是 O(log N)。
+    方块位置也是惰性的：只记录上次更新的时刻，需要时再按速度推算。
+    """
+
+    def __init__(self, positions, velocities, masses, widths=20.0, left_wall=None, right_wall=None):
+        n = len(positions)
+        if not (len(velocities) == len(masses) == n) or n == 0:
+            raise ValueError("positions、velocities、masses 长度必须相同且不为空")
+        if isinstance(widths, (int, float)):
+            widths = [widths] * n
+        self.x = [float(p) for p in positions]      # 方块中心在时刻 tx[i] 的位置
+        self.v = [float(u) for u in velocities]
+        self.m = [float(u) for u in masses]
+        self.w = [float(u) for u in widths]
+        self.tx = [0.0] * n
+        self.stamp = [0] * n                       # 速度每改变一次加一，用于作废旧事件
+        self.left_wall = left_wall
+        self.right_wall = right_wall
+        self.time = 0.0
+        self.collisions = 0
+        self._queue = []
+        self._seq = 0
+
+        for i in range(n - 1):
+            if self.x[i] + self.w[i] / 2 > self.x[i + 1] - self.w[i + 1] / 2:
+                raise ValueError("方块必须按位置从左到右排列且互不重叠")
+        for i in range(n - 1):
+            self._schedule_pair(i)
+        self._schedule_wall(0)
+        if n > 1:
+            self._schedule_wall(n - 1)
+
+    @property
+    def n(self):
+        """方块数量"""
+        return len(self.x)
+
+    def position(self, i, t=None):
+        """方块 i 在时刻 t（默认当前时刻）的中心位置"""
+        t = self.time if t is None else t
+        return self.x[i] + self.v[i] * (t - self.tx[i])
+
+    def positions(self, t=None):
+        """所有方块在时刻 t（默认当前时刻）的中心位置"""
+        return [self.position(i, t) for i in range(self.n)]
+
+    def _push(self, t, i, j):
+        """加入事件：j 为 i+1 表示方块相撞，-1 表示撞墙"""
+        self._seq += 1
+        sj = self.stamp[j] if j >= 0 else 0
+        heapq.heappush(self._queue, (t, self._seq, i, j, self.stamp[i], sj))
+
+    def _schedule_pair(self, i):
+        """预测方块 i 与 i+1 的下一次碰撞"""
+        v = self.v
+        if v[i] <= v[i + 1]:
+            return
+        now = self.time
+        gap = (self.position(i + 1, now) - self.w[i + 1] / 2) - (self.position(i, now) + self.w[i] / 2)
+        self._push(now + max(gap, 0.0) / (v[i] - v[i + 1]), i, i + 1)
+
+    def _schedule_wall(self, i):
+        """预测最外侧的方块 i 与墙壁的下一次碰撞"""
+        now = self.time
+        if i == 0 and self.left_wall is not None and self.v[i] < 0:
+            gap = self.position(i, now) - self.w[i] / 2 - self.left_wall
+            self._push(now + max(gap, 0.0) / -self.v[i], i, -1)
+        if i == self.n - 1 and self.right_wall is not None and self.v[i] > 0:
+            gap = self.right_wall - self.position(i, now) - self.w[i] / 2
+            self._push(now + max(gap, 0.0) / self.v[i], i, -1)
+
+    def _run(self, until, max_events):
+        """处理时刻不晚于 until 的事件，最多 max_events 个，返回处理的事件数"""
+        queue, x, v, m, tx, stamp = self._queue, self.x, self.v, self.m, self.tx, self.stamp
+        heappop = heapq.heappop
+        last = self.n - 1
+        limit = 8 * (last + 1) + 64
+        done = 0
+
+        while queue and done < max_events and queue[0][0] <= until:
+            t, _, i, j, si, sj = heappop(queue)
+            # 惰性作废：参与方的速度已经变过，这个预测不再成立
+            if stamp[i] != si or (j >= 0 and stamp[j] != sj):
+                continue
+
+            self.time = t
+            x[i] += v[i] * (t - tx[i])
+            tx[i] = t
+            stamp[i] += 1
+            if j >= 0:
+                x[j] += v[j] * (t - tx[j])
+                tx[j] = t
+                stamp[j] += 1
+                dv = v[i] - v[j]
+                total = m[i] + m[j]
+                v[i] -= 2 * m[j] / total * dv
+                v[j] += 2 * m[i] / total * dv
+                lo, hi = i, j
+            else:
+                v[i] = -v[i]
+                lo = hi = i
+            done += 1
+
+            # 只有参与碰撞的方块及其邻居需要重新预测
+            if lo > 0:
+                self._schedule_pair(lo - 1)
+            if hi < last:
+                self._schedule_pair(hi)
+            if lo == 0:
+                self._schedule_wall(0)
+            if hi == last and last > 0:
+                self._schedule_wall(last)
+
+            # 作废事件过多时原地重建队列，控制内存
+            if len(queue) > limit:
+                queue[:] = [e for e in queue
+                            if stamp[e[2]] == e[4] and (e[3] < 0 or stamp[e[3]] == e[5])]
+                heapq.heapify(queue)
+
+        self.collisions += done
+        return done
+
+    def next_event_time(self):
+        """下一次有效碰撞的时刻，没有则为 inf"""
+        stamp = self.stamp
+        while self._queue:
+            t, _, i, j, si, sj = self._queue[0]
+            if stamp[i] == si and (j < 0 or stamp[j] == sj):
+                return t
+            heapq.heappop(self._queue)
+        return float('inf')
+
+    def step_until(self, t, max_events=None):
+        """推进到时刻 t，返回期间处理的碰撞次数"""
+        if t < self.time:
+            raise ValueError("不能回退时间")
+        done = self._run(t, float('inf') if max_events is None else max_events)
+        if max_events is None or self.next_event_time() > t:
+            self.time = t
+        return done
+
+    def run_to_completion(self, max_events=None):
+        """一直推进到不再发生碰撞，返回总碰撞次数
+
+        两侧都有墙时碰撞永远不会停止，必须指定 max_events。
+        """
+        if max_events is None and self.left_wall is not None and self.right_wall is not None:
+            raise ValueError("两侧都有墙时碰撞不会停止，请指定 max_events")
+        self._run(float('inf'), float('inf') if max_events is None else max_events)
+        return self.collisions
+
+    def kinetic_energy(self):
+        """系统总动能，用于检查数值误差"""
+        return sum(m * v * v for m, v in zip(self.m, self.v)) / 2
+
+
+def random_engine(n, seed=0):
+    """生成 n 个随机方块、两侧有墙的测试系统"""
+    rng = random.Random(seed)
+    spacing = 30.0
+    positions = [spacing * (i + 1) for i in range(n)]
+    velocities = [rng.uniform(-5, 5) for _ in range(n)]
+    masses = [rng.uniform(1, 10) for _ in range(n)]
+    return CollisionEngine(positions, velocities, masses, widths=10.0,
+                           left_wall=0.0, right_wall=spacing * (n + 1))
+
+
+def benchmark(sizes=(10, 100, 1000, 10000), events=200000):
+    """对不同方块数量测量每秒处理的碰撞事件数"""
+    print(f"{'方块数':>8} {'事件数':>10} {'用时(秒)':>10} {'事件/秒':>12} {'能量相对误差':>14}")
+    for n in sizes:
+        engine = random_engine(n)
+        energy = engine.kinetic_energy()
+        start = time.perf_counter()
+        engine.run_to_completion(max_events=events)
+        elapsed = time.perf_counter() - start
+        drift = abs(engine.kinetic_energy() - energy) / energy
+        print(f"{n:>11} {engine.collisions:>13} {elapsed:>12.3f} {engine.collisions / elapsed:>15,.0f} {drift:>20.2e}")
+
+
+def pi_digits(k):
+    """用两方块加左墙复现 π 的前 k+1 位，验证引擎正确性"""
+    engine = CollisionEngine([150.0, 200.0], [0.0, -5.0], [1, 100**k], left_wall=50.0)
+    return engine.run_to_completion()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="一维 N 方块弹性碰撞引擎")
+    parser.add_argument("--bench", action="store_true", help="运行 N 最大到 10^4 的基准测试")
+    parser.add_argument("--events", type=int, default=200000, help="每组基准测试处理的事件数 (默认 200000)")
+    parser.add_argument("--pi", type=int, default=4, metavar="K", help="用质量比 100^K 复现 π (默认 4)")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(events=args.events)
+        sys.exit()
+
+    start = time.perf_counter()
+    collisions = pi_digits(args.pi)
+    print(f"质量比 1 : {100**args.pi}，碰撞次数 {collisions}，用时 {time.perf_counter() - start:.3f} 秒")
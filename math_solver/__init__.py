@@ -0,0 +1,6 @@
+"""math_solver：超几何分布与回归计算工具
+
+命令行入口为 python -m math_solver；各子模块按需导入，导入本包不会加载 NumPy。
+"""
+
+__all__ = ["hypgeom_dist", "hypgeom_sampler", "linear_regression", "least_squares", "robust_regression"]
@@ -0,0 +1,392 @@
+"""python -m math_solver 命令行入口
+
+子命令：
+    hypgeom  超几何分布（分布列、单点概率、尾部概率）
+    regress  一元线性回归
+    lstsq    多元 / 多项式最小二乘
+    sample   超几何分布蒙特卡洛抽样与拟合检验
+    batch    从 JSON/JSONL/CSV 文件读取大量问题，用进程池并行求解
+
+所有结果以 JSON / JSONL / CSV 输出；出错时返回非零退出码而不是调用 exit()。
+各子模块只在对应子命令中导入，只有确实需要 NumPy 的任务才会加载它。
+"""
+import sys
+import math
+import csv
+import json
+import importlib
+
+FORMATS = ("json", "jsonl", "csv")
+
+
+def _module(name):
+    """按需导入 math_solver 的子模块"""
+    return importlib.import_module(f"{__package__ or 'math_solver'}.{name}")
+
+
+def _value(v):
+    """把 Fraction 等结果转换成可 JSON 序列化的值
+
+    严格的 JSON 没有 inf/nan（如 log 模式的 ln 0 = -inf），这些值写成字符串 "inf"、"-inf"、"nan"。
+    """
+    from fractions import Fraction
+    if isinstance(v, Fraction):
+        return str(v)
+    if isinstance(v, float):
+        return v if math.isfinite(v) else str(v)
+    if isinstance(v, (list, tuple)):
+        return [_value(u) for u in v]
+    if isinstance(v, dict):
+        return {k: _value(u) for k, u in v.items()}
+    if hasattr(v, "tolist"):
+        return _value(v.tolist())
+    return v
+
+
+# ---------------- 各类问题的求解 ----------------
+# 每个函数接收一个参数字典，返回结果字典，参数错误时抛出 ValueError
+
+def solve_hypgeom(p):
+    """超几何分布
+
+    参数：N, M, n；mode（exact/float/log，默认 float）；
+    可选 k（给出该点的 pmf/cdf/sf）、tail（尾部概率，lower 为真时求下尾）、
+    window（[lo, hi]，只输出这一段分布列）。都不给时输出整个分布列。
+    """
+    hd = _module("hypgeom_dist")
+    N, M, n = int(p["N"]), int(p["M"]), int(p["n"])
+    mode = p.get("mode", "float")
+    hd.check_params(N, M, n)
+    expectation, variance = hd.mean_var(N, M, n)
+    exact = mode == "exact"
+    result = {
+        "N": N, "M": M, "n": n, "mode": mode,
+        "mean": expectation if exact else float(expectation),
+        "var": variance if exact else float(variance),
+    }
+    if p.get("k") is not None:
+        k = int(p["k"])
+        result["k"] = k
+        _, values = hd.pmf_window(N, M, n, k, k, mode)
+        result["pmf"] = values[0] if values else {"exact": 0, "float": 0.0, "log": float("-inf")}[mode]
+        result["cdf"] = hd.tail(N, M, n, k, upper=False, mode=mode)
+        result["sf"] = hd.tail(N, M, n, k + 1, upper=True, mode=mode)
+    if p.get("tail") is not None:
+        lower = bool(p.get("lower", False))
+        result["tail"] = int(p["tail"])
+        result["lower"] = lower
+        result["tail_prob"] = hd.tail(N, M, n, int(p["tail"]), upper=not lower, mode=mode)
+    if p.get("k") is None and p.get("tail") is None:
+        if p.get("window") is not None:
+            lo, hi = p["window"]
+            k_min, values = hd.pmf_window(N, M, n, int(lo), int(hi), mode)
+        else:
+            k_min, values = hd.pmf_table(N, M, n, mode)
+        result["k_min"] = k_min
+        result["pmf"] = values
+    return result
+
+
+def _points(p, exact=False):
+    """从参数中取出数据点：points 为 "x,y x,y ..." 字符串或 [[x, y], ...]，或者分别给出 x、y
+
+    exact 为真时每个坐标解析为 (分子, 分母) 整数对；JSON 中的数字按其十进制写法精确解析。
+    """
+    lr = _module("linear_regression")
+    points = p.get("points")
+    if isinstance(points, str):
+        parse = lr.parse_exact_point if exact else lr.parse_point
+        pairs = [parse(item) for item in points.split()]
+    else:
+        if points is None:
+            points = zip(p["x"], p["y"])
+        if exact:
+            pairs = [(lr.parse_rational(str(x)), lr.parse_rational(str(y))) for x, y in points]
+        else:
+            pairs = [(float(x), float(y)) for x, y in points]
+    return [x for x, _ in pairs], [y for _, y in pairs]
+
+
+def solve_regress(p):
+    """一元线性回归
+
+    参数：points 或 x/y；可选 exact（精确分数结果）、robust（theil-sen/ransac）及 threshold、iterations、seed。
+    """
+    if p.get("exact"):
+        xs, ys = _points(p, exact=True)
+        acc = _module("linear_regression").ExactRegression()
+        acc.update(xs, ys)
+        m, b = acc.fit()
+        return {"count": acc.n, "slope": m, "intercept": b, "exact": True}
+    xs, ys = _points(p)
+    robust = p.get("robust")
+    result = {"count": len(xs)}
+    if robust:
+        rr = _module("robust_regression")
+        if robust == "theil-sen":
+            m, b = rr.theil_sen(xs, ys, seed=p.get("seed"))
+        elif robust == "ransac":
+            fit = rr.ransac(xs, ys, p.get("threshold"), int(p.get("iterations", 1000)), seed=p.get("seed"))
+            m, b = fit["slope"], fit["intercept"]
+            result["inliers"] = fit["inliers"]
+        else:
+            raise ValueError(f"未知的稳健回归方法: {robust}")
+        result.update(slope=m, intercept=b, robust=robust)
+        return result
+    acc = _module("linear_regression").RegressionAccumulator()
+    acc.update(xs, ys)
+    m, b = acc.fit()
+    result.update(slope=m, intercept=b, r2=acc.r_squared())
+    return result
+
+
+def solve_lstsq(p):
+    """多元 / 多项式最小二乘
+
+    参数：X（每行一个样本的特征列表，单特征时也可以是数字列表）、y；
+    可选 degree（默认 1）、intercept（默认真）、method（qr/normal）。
+    """
+    import numpy as np
+    ls = _module("least_squares")
+    y = np.asarray(p["y"], dtype=float)
+    X = np.asarray(p["X"], dtype=float).reshape(len(y), -1)
+    model = ls.LeastSquares(X.shape[1], int(p.get("degree", 1)), bool(p.get("intercept", True)),
+                            p.get("method", "qr"))
+    model.update(X, y)
+    fit = model.solve()
+    return {
+        "count": fit["n"],
+        "names": model.names(),
+        "coef": fit["coef"],
+        "stderr": fit["stderr"],
+        "r2": fit["r2"],
+        "adj_r2": fit["adj_r2"],
+        "sigma": fit["sigma"],
+        "dof": fit["dof"],
+    }
+
+
+def solve_sample(p):
+    """超几何分布抽样与拟合检验
+
+    参数：N, M, n；可选 draws（默认 100000）、seed、method。
+    """
+    hs = _module("hypgeom_sampler")
+    N, M, n = int(p["N"]), int(p["M"]), int(p["n"])
+    samples = hs.sample(N, M, n, int(p.get("draws", 100000)), p.get("seed"), p.get("method", "auto"))
+    fit = hs.goodness_of_fit(samples, N, M, n, exact=bool(p.get("exact", False)))
+    return {
+        "N": N, "M": M, "n": n,
+        "draws": fit["draws"],
+        "sample_mean": float(samples.mean()),
+        "statistic": fit["statistic"],
+        "df": fit["df"],
+        "p_value": fit["p_value"],
+        "tv_distance": fit["tv_distance"],
+    }
+
+
+TASKS = {
+    "hypgeom": solve_hypgeom,
+    "regress": solve_regress,
+    "lstsq": solve_lstsq,
+    "sample": solve_sample,
+}
+
+
+def run_task(item):
+    """求解批量任务中的一个问题，错误写入结果而不中断整批"""
+    index, problem = item
+    result = {"id": problem.get("id", index), "task": problem.get("task")}
+    try:
+        solver = TASKS[problem.get("task")]
+    except KeyError:
+        result["error"] = f"未知任务类型: {problem.get('task')}，可选 {', '.join(TASKS)}"
+        return result
+    try:
+        result.update(solver(problem))
+    except KeyError as e:
+        result["error"] = f"缺少参数: {e}"
+    except Exception as e:
+        # 任何一个问题出错（包括 OverflowError 等）都只记在它自己的结果里
+        result["error"] = str(e) or type(e).__name__
+    return {k: _value(v) for k, v in result.items()}
+
+
+# ---------------- 批量输入 ----------------
+
+def _cell(text):
+    """CSV 单元格：能转成整数或浮点数的就转换，JSON 列表保持原样解析"""
+    text = text.strip()
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    if text[:1] in "[{":
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    return text
+
+
+def load_problems(path, default_task=None):
+    """读取批量问题文件：.json（列表或 {"problems": [...]}）、.jsonl 或 .csv（首行为参数名）"""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    with stream:
+        if path.lower().endswith(".csv"):
+            problems = [{k: _cell(v) for k, v in row.items() if v is not None and v.strip() != ""}
+                        for row in csv.DictReader(stream)]
+        elif path.lower().endswith(".jsonl") or path == "-":
+            problems = [json.loads(line) for line in stream if line.strip()]
+        else:
+            data = json.load(stream)
+            problems = data["problems"] if isinstance(data, dict) else data
+    if default_task:
+        for problem in problems:
+            problem.setdefault("task", default_task)
+    return problems
+
+
+def solve_all(problems, workers=None):
+    """按输入顺序逐个产生结果；问题较多且 workers 不为 1 时使用进程池"""
+    items = list(enumerate(problems))
+    if workers == 1 or len(items) < 64:
+        yield from map(run_task, items)
+        return
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(run_task, items, chunksize=max(1, len(items) // (workers * 16)))
+
+
+# ---------------- 输出 ----------------
+
+def write_results(results, fmt, output=None, single=False):
+    """按格式输出结果，返回出错的个数；single 为真时 json 格式输出单个对象而不是列表"""
+    stream = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    errors = 0
+    try:
+        if fmt == "jsonl":
+            for r in results:
+                errors += "error" in r
+                stream.write(json.dumps(r, ensure_ascii=False, allow_nan=False) + "\n")
+            return errors
+        results = list(results)
+        errors = sum("error" in r for r in results)
+        if fmt == "json":
+            data = results[0] if single else results
+            json.dump(data, stream, ensure_ascii=False, indent=2, allow_nan=False)
+            stream.write("\n")
+        else:
+            fields = list(dict.fromkeys(k for r in results for k in r))
+            writer = csv.DictWriter(stream, fieldnames=fields)
+            writer.writeheader()
+            for r in results:
+                writer.writerow({k: json.dumps(v, ensure_ascii=False, allow_nan=False) if isinstance(v, (list, dict)) else v
+                                 for k, v in r.items()})
+        return errors
+    finally:
+        if output:
+            stream.close()
+
+
+def main(argv=None):
+    import argparse
+
+    # 输出选项写在子命令前后都可以。各子命令通过 parents 共用同一组 Action，
+    # 所以默认值必须保持 SUPPRESS（否则子命令会用默认值覆盖写在前面的值），解析后再补默认值
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=FORMATS, default=argparse.SUPPRESS, help="输出格式 (默认 json)")
+    common.add_argument("--output", default=argparse.SUPPRESS, help="输出文件 (默认标准输出)")
+    parser = argparse.ArgumentParser(prog="python -m math_solver", description="math_solver 命令行工具",
+                                     parents=[common])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("hypgeom", help="超几何分布", parents=[common])
+    p.add_argument("N", type=int)
+    p.add_argument("M", type=int)
+    p.add_argument("n", type=int)
+    p.add_argument("--mode", choices=("exact", "float", "log"), default="float")
+    p.add_argument("-k", type=int, help="只计算 X=k 处的 pmf/cdf/sf")
+    p.add_argument("--tail", type=int, metavar="K0", help="尾部概率 P(X ≥ K0)")
+    p.add_argument("--lower", action="store_true", help="与 --tail 同用，改为 P(X ≤ K0)")
+    p.add_argument("--window", nargs=2, type=int, metavar=("LO", "HI"))
+
+    p = sub.add_parser("regress", help="一元线性回归", parents=[common])
+    p.add_argument("points", nargs="?", help='数据点 "x,y x,y ..."，省略时从标准输入读取')
+    p.add_argument("--exact", action="store_true", help="按有理数精确计算，输出分数")
+    p.add_argument("--robust", choices=("theil-sen", "ransac"))
+    p.add_argument("--threshold", type=float)
+    p.add_argument("--iterations", type=int, default=1000)
+    p.add_argument("--seed", type=int)
+
+    p = sub.add_parser("lstsq", help="多元 / 多项式最小二乘，读取 x1,...,xk,y 的 CSV 文件", parents=[common])
+    p.add_argument("path")
+    p.add_argument("--degree", type=int, default=1)
+    p.add_argument("--no-intercept", action="store_true")
+    p.add_argument("--method", choices=("qr", "normal"), default="qr")
+    p.add_argument("--skip-header", action="store_true")
+
+    p = sub.add_parser("sample", help="超几何分布抽样与拟合检验", parents=[common])
+    p.add_argument("N", type=int)
+    p.add_argument("M", type=int)
+    p.add_argument("n", type=int)
+    p.add_argument("--draws", type=int, default=100000)
+    p.add_argument("--seed", type=int)
+    p.add_argument("--exact", action="store_true", help="用精确分布列做检验")
+
+    p = sub.add_parser("batch", help="批量求解 JSON/JSONL/CSV 文件中的问题", parents=[common])
+    p.add_argument("path", help="问题文件，'-' 表示从标准输入读取 JSONL")
+    p.add_argument("--task", choices=TASKS, help="问题中没有 task 字段时使用的任务类型")
+    p.add_argument("--workers", type=int, help="进程数 (默认 CPU 核数，1 表示不使用进程池)")
+
+    args = parser.parse_args(argv)
+    fmt = getattr(args, "format", "json")
+    output = getattr(args, "output", None)
+
+    if args.command == "batch":
+        try:
+            problems = load_problems(args.path, args.task)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"错误：无法读取问题文件：{e}", file=sys.stderr)
+            return 2
+        errors = write_results(solve_all(problems, args.workers), fmt, output)
+        return 1 if errors else 0
+
+    if args.command == "hypgeom":
+        problem = {"task": "hypgeom", "N": args.N, "M": args.M, "n": args.n, "mode": args.mode,
+                   "k": args.k, "tail": args.tail, "lower": args.lower, "window": args.window}
+    elif args.command == "regress":
+        points = args.points if args.points is not None else sys.stdin.read()
+        problem = {"task": "regress", "points": points, "exact": args.exact, "robust": args.robust,
+                   "threshold": args.threshold, "iterations": args.iterations, "seed": args.seed}
+    elif args.command == "lstsq":
+        ls = _module("least_squares")
+        try:
+            model = ls.fit_csv(args.path, args.degree, not args.no_intercept, args.method,
+                               skip_header=args.skip_header)
+            fit = model.solve()
+        except (ValueError, OSError) as e:
+            print(e, file=sys.stderr)
+            return 1
+        result = {"count": fit["n"], "names": model.names(), "coef": fit["coef"], "stderr": fit["stderr"],
+                  "r2": fit["r2"], "adj_r2": fit["adj_r2"], "sigma": fit["sigma"], "dof": fit["dof"]}
+        write_results([{k: _value(v) for k, v in result.items()}], fmt, output, single=True)
+        return 0
+    else:
+        problem = {"task": "sample", "N": args.N, "M": args.M, "n": args.n,
+                   "draws": args.draws, "seed": args.seed, "exact": args.exact}
+
+    result = run_task((0, problem))
+    del result["id"]
+    write_results([result], fmt, output, single=True)
+    return 1 if "error" in result else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,11 @@
+import os
 import sys
 import math
+from array import array
+from bisect import bisect_left
 from fractions import Fraction
+from functools import lru_cache
+from itertools import accumulate
 
 def format_fraction(f):
     """格式化分数输出"""
@@ -24,45 +29,601 @@ else:
             result = result * (n - k + i) // i
         return result
 
-# 输入处理
-try:
-    N = int(input("请输入总体数量 N: "))
-    M = int(input("请输入成功项数量 M: "))
-    n = int(input("请输入抽样数量 n: "))
-except ValueError:
-    print("输入必须为整数")
-    exit()
-
-# 参数验证
-if not all([N >= 1, 0 <= M <= N, 0 <= n <= N]):
-    print("参数范围错误")
-    exit()
-
-# 计算合法k范围
-k_min = max(0, n + M - N)
-k_max = min(n, M)
-if k_min > k_max:
-    print("无效参数组合")
-    exit()
-
-# 计算分布列
-distribution = {}
-for k in range(k_min, k_max + 1):
-    c1 = comb(M, k)
-    c2 = comb(N-M, n-k)
-    c_total = comb(N, n)
-    prob = Fraction(c1*c2, c_total) if c_total else Fraction(0)
-    distribution[k] = prob
-
-# 计算期望和方差
-expectation = Fraction(n*M, N)
-variance = expectation * Fraction(N-M, N) * Fraction(N-n, N-1) if N > 1 else Fraction(0)
-
-# 输出结果
-print("\n超几何分布列:")
-for k in sorted(distribution):
-    print(f"P(X={k}) = {format_fraction(distribution[k])}")
-
-print(f"\n概率验证: {format_fraction(sum(distribution.values()))} = 1")
-print(f"期望值: {format_fraction(expectation)} ≈ {float(expectation):.4f}")
-print(f"方差值: {format_fraction(variance)} ≈ {float(variance):.4f}")
\ No newline at end of file
+# ---------------- 组合数缓存 ----------------
+# 同一个 N 往往要算很多次分布，C(N, n) 这类大整数和对数阶乘都在进程内缓存
+
+COMB_CACHE_SIZE = 256            # 精确组合数最多缓存多少个（大 N 时每个可达数百 KB）
+LOG_FACTORIAL_LIMIT = 1 << 22    # 对数阶乘表的最大长度，超出后直接用 lgamma
+LOG_FACTORIAL_EAGER = 1 << 17    # 不超过此值时表一次扩展到 x；更大的 x 只在不超过表长两倍时才扩展
+
+comb = lru_cache(maxsize=COMB_CACHE_SIZE)(comb)
+
+_log_factorials = array('d', [0.0])     # 第 i 项为 ln(i!)，按需增长
+_log_factorial_stats = {"hits": 0, "misses": 0}
+
+
+def log_factorial(x):
+    """ln(x!)，查表；表不够长时一次扩展到 x（至少翻倍）
+
+    x 较大且远超表长时不扩展，直接调用 lgamma，
+    免得一次冷查询就要逐项算出数百万个对数阶乘。
+    """
+    table = _log_factorials
+    if x < len(table):
+        _log_factorial_stats["hits"] += 1
+        return table[x]
+    _log_factorial_stats["misses"] += 1
+    if x >= LOG_FACTORIAL_LIMIT or (x >= LOG_FACTORIAL_EAGER and x >= 2 * len(table)):
+        return math.lgamma(x + 1)
+    end = min(max(x + 1, 2 * len(table)), LOG_FACTORIAL_LIMIT)
+    # 逐项用 lgamma 而不是累加 ln(i)，误差不随长度积累
+    table.extend(map(math.lgamma, range(len(table) + 1, end + 1)))
+    return table[x]
+
+
+def cache_stats():
+    """缓存命中情况"""
+    info = comb.cache_info()
+    return {
+        "comb_hits": info.hits,
+        "comb_misses": info.misses,
+        "comb_size": info.currsize,
+        "comb_maxsize": info.maxsize,
+        "log_factorial_hits": _log_factorial_stats["hits"],
+        "log_factorial_misses": _log_factorial_stats["misses"],
+        "log_factorial_size": len(_log_factorials),
+    }
+
+
+def clear_caches():
+    """清空所有缓存"""
+    comb.cache_clear()
+    del _log_factorials[1:]
+    _log_factorial_stats.update(hits=0, misses=0)
+
+
+# 分布列的计算模式
+MODES = ("exact", "float", "log")
+
+
+def check_params(N, M, n):
+    """参数验证，不合法时抛出 ValueError"""
+    if not all([N >= 1, 0 <= M <= N, 0 <= n <= N]):
+        raise ValueError("参数范围错误")
+
+
+def support(N, M, n):
+    """X 的取值范围 (k_min, k_max)"""
+    return max(0, n + M - N), min(n, M)
+
+
+def mode_of(N, M, n):
+    """分布的众数（概率最大的 k）"""
+    k_min, k_max = support(N, M, n)
+    return min(max((n + 1) * (M + 1) // (N + 2), k_min), k_max)
+
+
+def log_comb(a, b):
+    """ln C(a, b)"""
+    return log_factorial(a) - log_factorial(b) - log_factorial(a - b)
+
+
+def log_pmf_at(k, N, M, n):
+    """单个 k 的 ln P(X=k)，基于对数阶乘表"""
+    return log_comb(M, k) + log_comb(N - M, n - k) - log_comb(N, n)
+
+
+def _check_mode(mode):
+    if mode not in MODES:
+        raise ValueError(f"未知模式: {mode}，可选 {', '.join(MODES)}")
+
+
+def pmf_window(N, M, n, lo, hi, mode="float"):
+    """只计算 k ∈ [lo, hi] 的概率，返回 (窗口起点, 概率列表)
+
+    窗口先与支撑集取交集。相邻两项之比
+        P(k+1)/P(k) = (M-k)(n-k) / ((k+1)(N-M-n+k+1))
+    所以只需算一次首项，其余各项逐项递推，时间和内存都只与窗口长度有关：
+    exact 模式用整数递推分子 C(M,k)·C(N-M,n-k)（每步都能整除），返回 Fraction；
+    float 模式从窗口内离众数最近的点出发向两侧递推，尾部下溢为 0 不影响结果；
+    log 模式返回 ln P，同样从该点出发累加对数比值，适合极小的尾部概率。
+    """
+    check_params(N, M, n)
+    _check_mode(mode)
+    k_min, k_max = support(N, M, n)
+    lo, hi = max(lo, k_min), min(hi, k_max)
+    if lo > hi:
+        return lo, []
+    rest = N - M - n
+
+    if mode == "exact":
+        total = comb(N, n)
+        term = comb(M, lo) * comb(N - M, n - lo)
+        values = [Fraction(term, total)]
+        for k in range(lo, hi):
+            term = term * (M - k) * (n - k) // ((k + 1) * (rest + k + 1))
+            values.append(Fraction(term, total))
+        return lo, values
+
+    start = min(max(mode_of(N, M, n), lo), hi)
+    log_start = log_pmf_at(start, N, M, n)
+    values = [0.0] * (hi - lo + 1)
+    i = start - lo
+
+    if mode == "float":
+        # 递推进入次正规数后 p·比值 会被舍入回最小次正规数而不再变为 0，
+        # 所以低于最小正规数就停止，其余项按下溢处理为 0
+        tiny = sys.float_info.min
+        p = values[i] = math.exp(log_start)
+        for k in range(start, hi):
+            p = p * ((M - k) * (n - k)) / ((k + 1) * (rest + k + 1))
+            if p < tiny:
+                break
+            values[k + 1 - lo] = p
+        p = values[i]
+        for k in range(start - 1, lo - 1, -1):
+            p = p * ((k + 1) * (rest + k + 1)) / ((M - k) * (n - k))
+            if p < tiny:
+                break
+            values[k - lo] = p
+        return lo, values
+
+    log = math.log
+    lp = values[i] = log_start
+    for k in range(start, hi):
+        lp += log((M - k) * (n - k)) - log((k + 1) * (rest + k + 1))
+        values[k + 1 - lo] = lp
+    lp = log_start
+    for k in range(start - 1, lo - 1, -1):
+        lp += log((k + 1) * (rest + k + 1)) - log((M - k) * (n - k))
+        values[k - lo] = lp
+    return lo, values
+
+
+def pmf_table(N, M, n, mode="exact"):
+    """计算整个分布列，返回 (k_min, 概率列表)
+
+    即覆盖整个支撑集的 pmf_window。N 很大时对数阶乘相减得到的众数概率
+    有 1e-8 量级的绝对误差，所以 float/log 两种模式最后按总和归一化一次。
+    """
+    check_params(N, M, n)
+    k_min, k_max = support(N, M, n)
+    k_min, values = pmf_window(N, M, n, k_min, k_max, mode)
+    if mode == "float":
+        total = math.fsum(values)
+        return k_min, [p / total for p in values]
+    if mode == "log":
+        peak = max(values)
+        shift = peak + math.log(math.fsum(math.exp(lp - peak) for lp in values))
+        return k_min, [lp - shift for lp in values]
+    return k_min, values
+
+
+def tail(N, M, n, k0, upper=True, mode="float", tol=1e-16):
+    """尾部概率：upper 为真时求 P(X ≥ k0)，否则求 P(X ≤ k0)
+
+    float/log 模式从尾部内离众数最近的点出发向外累加，
+    某项小于 tol × 已累加和时停止（分布是单峰的，之后的项只会更小），
+    所以代价只与尾部里有效的项数有关，不会展开整个分布列。
+    log 模式返回 ln P，尾部概率小于 1e-308 时也不会下溢。
+    exact 模式必须逐项求和，于是选择尾部与其补集中较短的一侧累加整数分子。
+    """
+    check_params(N, M, n)
+    _check_mode(mode)
+    k_min, k_max = support(N, M, n)
+    lo, hi = (max(k0, k_min), k_max) if upper else (k_min, min(k0, k_max))
+    if lo > hi:
+        return {"exact": Fraction(0), "float": 0.0, "log": -math.inf}[mode]
+    rest = N - M - n
+
+    if mode == "exact":
+        complement = (hi - lo + 1) * 2 > k_max - k_min + 1
+        if complement:
+            lo, hi = (k_min, lo - 1) if upper else (hi + 1, k_max)
+        s = 0
+        if lo <= hi:
+            term = comb(M, lo) * comb(N - M, n - lo)
+            s = term
+            for k in range(lo, hi):
+                term = term * (M - k) * (n - k) // ((k + 1) * (rest + k + 1))
+                s += term
+        result = Fraction(s, comb(N, n))
+        return 1 - result if complement else result
+
+    # 各项相对起点的比值，从 1 开始向两侧递减
+    start = min(max(mode_of(N, M, n), lo), hi)
+    total = r = 1.0
+    for k in range(start, hi):
+        r *= ((M - k) * (n - k)) / ((k + 1) * (rest + k + 1))
+        total += r
+        if r < tol * total:
+            break
+    r = 1.0
+    for k in range(start - 1, lo - 1, -1):
+        r *= ((k + 1) * (rest + k + 1)) / ((M - k) * (n - k))
+        total += r
+        if r < tol * total:
+            break
+    log_tail = min(log_pmf_at(start, N, M, n) + math.log(total), 0.0)
+    return log_tail if mode == "log" else math.exp(log_tail)
+
+
+def mean_var(N, M, n):
+    """精确的期望和方差（Fraction）"""
+    expectation = Fraction(n*M, N)
+    variance = expectation * Fraction(N-M, N) * Fraction(N-n, N-1) if N > 1 else Fraction(0)
+    return expectation, variance
+
+
+# ---------------- 向量化接口 ----------------
+# k 与 (N, M, n) 都可以是标量或 NumPy 数组，按广播规则逐元素计算；
+# 相同的 (N, M, n) 只算一次分布列。exact=True 时返回 Fraction 组成的 object 数组。
+
+def _int_arrays(*values):
+    """转换为广播后的 int64 数组"""
+    import numpy as np
+    return np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in values))
+
+
+def _groups(N, M, n):
+    """按不同的 (N, M, n) 分组，逐组产生 (N, M, n, 元素下标)"""
+    import numpy as np
+    triples = np.stack([N.ravel(), M.ravel(), n.ravel()], axis=1)
+    if triples.size == 0:
+        return
+    unique, inverse = np.unique(triples, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.searchsorted(inverse[order], np.arange(len(unique) + 1))
+    for (N_, M_, n_), lo, hi in zip(unique.tolist(), bounds[:-1], bounds[1:]):
+        yield N_, M_, n_, order[lo:hi]
+
+
+def _cumulative(N, M, n, exact):
+    """一组参数的 (k_min, 分布列, 累积分布 P(X≤k), 上尾 P(X>k))"""
+    import numpy as np
+    entry = None if exact or _default_table is None else _default_table.entry(N, M, n)
+    if entry is not None:
+        k_min, values = entry
+    else:
+        k_min, values = pmf_table(N, M, n, "exact" if exact else "float")
+    if exact:
+        cdf = list(accumulate(values))
+        sf = [1 - c for c in cdf]
+        return k_min, values, cdf, sf
+    values = np.array(values)
+    cdf = np.minimum(np.cumsum(values), 1.0)
+    # 上尾从右往左累加，避免 1 - cdf 的相消误差
+    sf = np.append(np.cumsum(values[::-1])[::-1][1:], 0.0)
+    return k_min, values, cdf, sf
+
+
+def _evaluate(kind, k, N, M, n, exact):
+    """pmf/cdf/sf 的公共实现"""
+    import numpy as np
+    k, N, M, n = _int_arrays(k, N, M, n)
+    below, above = {"pmf": (0, 0), "cdf": (0, 1), "sf": (1, 0)}[kind]
+    if exact:
+        out = np.empty(k.shape, dtype=object).ravel()
+        below, above = Fraction(below), Fraction(above)
+    else:
+        out = np.empty(k.size, dtype=float)
+    flat_k = k.ravel()
+
+    for N_, M_, n_, idx in _groups(N, M, n):
+        k_min, values, cdf, sf = _cumulative(N_, M_, n_, exact)
+        table = {"pmf": values, "cdf": cdf, "sf": sf}[kind]
+        j = flat_k[idx] - k_min
+        if exact:
+            for i, jj in zip(idx.tolist(), j.tolist()):
+                out[i] = below if jj < 0 else above if jj >= len(table) else table[jj]
+        else:
+            inside = table[np.clip(j, 0, len(table) - 1)]
+            out[idx] = np.where(j < 0, below, np.where(j >= len(table), above, inside))
+    return out.reshape(k.shape)[()]
+
+
+def pmf(k, N, M, n, exact=False):
+    """P(X = k)"""
+    return _evaluate("pmf", k, N, M, n, exact)
+
+
+def cdf(k, N, M, n, exact=False):
+    """P(X ≤ k)"""
+    return _evaluate("cdf", k, N, M, n, exact)
+
+
+def sf(k, N, M, n, exact=False):
+    """P(X > k)，上尾直接累加，不经过 1 - cdf"""
+    return _evaluate("sf", k, N, M, n, exact)
+
+
+def ppf(q, N, M, n, exact=False):
+    """分位数：满足 P(X ≤ k) ≥ q 的最小 k"""
+    import numpy as np
+    N, M, n = _int_arrays(N, M, n)
+    q = np.asarray(q, dtype=object if exact else float)
+    q, N, M, n = np.broadcast_arrays(q, N, M, n)
+    if not exact and np.any((q < 0) | (q > 1)):
+        raise ValueError("q 必须在 [0, 1] 内")
+    out = np.empty(q.size, dtype=np.int64)
+    flat_q = q.ravel()
+
+    for N_, M_, n_, idx in _groups(N, M, n):
+        k_min, _, table, _ = _cumulative(N_, M_, n_, exact)
+        last = len(table) - 1
+        if exact:
+            for i in idx.tolist():
+                out[i] = k_min + min(bisect_left(table, Fraction(flat_q[i])), last)
+        else:
+            out[idx] = k_min + np.minimum(np.searchsorted(table, flat_q[idx]), last)
+    return out.reshape(q.shape)[()]
+
+
+def mean(N, M, n, exact=False):
+    """期望 nM/N"""
+    import numpy as np
+    N, M, n = _int_arrays(N, M, n)
+    if exact:
+        return np.asarray(np.frompyfunc(lambda a, b, c: mean_var(a, b, c)[0], 3, 1)(N, M, n))[()]
+    return (n * (M / N))[()]
+
+
+def var(N, M, n, exact=False):
+    """方差 n(M/N)(1-M/N)(N-n)/(N-1)"""
+    import numpy as np
+    N, M, n = _int_arrays(N, M, n)
+    if exact:
+        return np.asarray(np.frompyfunc(lambda a, b, c: mean_var(a, b, c)[1], 3, 1)(N, M, n))[()]
+    p = M / N
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.where(N > 1, n * p * (1 - p) * (N - n) / np.maximum(N - 1, 1), 0.0)
+    return result[()]
+
+
+# ---------------- 预计算查找表 ----------------
+# 查找表由两个 .npy 文件组成，以内存映射方式打开：
+#   <路径>.index.npy  形状 (3, 条目数) 的 int64：按键排序的键、在取值数组中的偏移、k_min
+#   <路径>.values.npy 所有条目的浮点分布列首尾相接
+# 键为 (N << 40) | (M << 20) | n，要求 N < 2^23、M 与 n < 2^20，超出范围的参数不入表也不查表。
+
+def in_table_range(N, M, n):
+    """(N, M, n) 能否编码为查找表的键"""
+    return 0 <= N < 1 << 23 and 0 <= M < 1 << 20 and 0 <= n < 1 << 20
+
+
+def table_key(N, M, n):
+    """(N, M, n) 在查找表中的键"""
+    return (N << 40) | (M << 20) | n
+
+
+def table_keys(max_N, min_N=1):
+    """min_N ≤ N ≤ max_N 的全部 (N, M, n)"""
+    for N in range(min_N, max_N + 1):
+        for M in range(N + 1):
+            for n in range(N + 1):
+                yield N, M, n
+
+
+def build_table(path, keys):
+    """为 keys 中的每个 (N, M, n) 计算浮点分布列并写入查找表，返回条目数
+
+    各条目的长度由支撑集直接算出，取值数组预先以内存映射方式分配，边算边写。
+    """
+    import numpy as np
+    keys = sorted({(int(N), int(M), int(n)) for N, M, n in keys})
+    for N, M, n in keys:
+        check_params(N, M, n)
+        if not in_table_range(N, M, n):
+            raise ValueError("查找表只支持 N < 2^23、M 与 n < 2^20")
+    index = np.empty((3, len(keys)), dtype=np.int64)
+    offset = 0
+    for i, (N, M, n) in enumerate(keys):
+        k_min, k_max = support(N, M, n)
+        index[:, i] = table_key(N, M, n), offset, k_min
+        offset += k_max - k_min + 1
+
+    values = np.lib.format.open_memmap(f"{path}.values.npy", mode="w+", dtype=np.float64, shape=(offset,))
+    for i, (N, M, n) in enumerate(keys):
+        _, pmf = pmf_table(N, M, n, "float")
+        start = int(index[1, i])
+        values[start:start + len(pmf)] = pmf
+    values.flush()
+    del values
+    np.save(f"{path}.index.npy", index)
+    return len(keys)
+
+
+class PMFTable:
+    """以内存映射方式打开的超几何分布查找表
+
+    文件在第一次查询时才打开（冷启动只是一次 mmap）；
+    每个查到的条目另存入字典，同一 (N, M, n) 的重复查询为 O(1)。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._keys = None
+        self._offsets = None
+        self._k_mins = None
+        self._values = None
+        self._entries = {}
+
+    def _open(self):
+        import numpy as np
+        index = np.load(f"{self.path}.index.npy", mmap_mode="r")
+        self._keys, self._offsets, self._k_mins = index
+        self._values = np.load(f"{self.path}.values.npy", mmap_mode="r")
+
+    def entry(self, N, M, n):
+        """返回 (k_min, 分布列视图)，表中没有时返回 None
+
+        超出键的编码范围时直接按未命中处理，以免键相互重叠而查到别的分布。
+        """
+        if not in_table_range(N, M, n):
+            return None
+        key = table_key(N, M, n)
+        found = self._entries.get(key)
+        if found is not None or key in self._entries:
+            return found
+        if self._keys is None:
+            self._open()
+        i = int(self._keys.searchsorted(key))
+        found = None
+        if i < len(self._keys) and self._keys[i] == key:
+            k_min, k_max = support(N, M, n)
+            # 存储的 k_min 与参数不符说明表文件与键不匹配，按未命中处理
+            if int(self._k_mins[i]) == k_min:
+                start = int(self._offsets[i])
+                found = k_min, self._values[start:start + k_max - k_min + 1]
+        self._entries[key] = found
+        return found
+
+    def pmf(self, k, N, M, n):
+        """查表得到 P(X=k)，表中没有时返回 None"""
+        found = self.entry(N, M, n)
+        if found is None:
+            return None
+        k_min, values = found
+        j = k - k_min
+        return float(values[j]) if 0 <= j < len(values) else 0.0
+
+    def __len__(self):
+        if self._keys is None:
+            self._open()
+        return len(self._keys)
+
+
+_default_table = None
+
+
+def use_table(path):
+    """设置进程内默认的查找表（path 为 None 时取消）
+
+    之后 pmf/cdf/sf/ppf 的浮点模式以及 lookup_pmf 会先查表，查不到再现算。
+    只记录路径，不读文件。
+    """
+    global _default_table
+    _default_table = None if path is None else PMFTable(path)
+
+
+def lookup_pmf(k, N, M, n):
+    """单点浮点概率 P(X=k)：优先查默认查找表，否则现算"""
+    if _default_table is not None:
+        p = _default_table.pmf(k, N, M, n)
+        if p is not None:
+            return p
+    k_min, k_max = support(N, M, n)
+    if not k_min <= k <= k_max:
+        check_params(N, M, n)
+        return 0.0
+    return math.exp(log_pmf_at(k, N, M, n))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="超几何分布计算")
+    parser.add_argument("--mode", choices=MODES, default="exact",
+                        help="exact 输出精确分数，float 输出浮点概率，log 输出 ln P (默认 exact)")
+    parser.add_argument("--window", nargs=2, type=int, metavar=("LO", "HI"),
+                        help="只输出 LO ≤ k ≤ HI 的分布列")
+    parser.add_argument("--tail", type=int, metavar="K0", help="只计算尾部概率 P(X ≥ K0)")
+    parser.add_argument("--lower", action="store_true", help="与 --tail 同用，改为计算 P(X ≤ K0)")
+    parser.add_argument("--build-table", metavar="PATH",
+                        help="预计算查找表并写入 PATH.index.npy / PATH.values.npy 后退出")
+    parser.add_argument("--table-max-n", type=int, default=100,
+                        help="查找表包含 N ≤ 此值的全部 (N, M, n) (默认 100)")
+    parser.add_argument("--table-keys", metavar="CSV",
+                        help="改为只为 CSV 文件中每行的 N,M,n 建表")
+    parser.add_argument("--table", metavar="PATH", help="float 模式下先查 PATH 处的查找表")
+    args = parser.parse_args()
+
+    if args.build_table:
+        import time
+        start = time.perf_counter()
+        try:
+            if args.table_keys:
+                with open(args.table_keys, encoding="utf-8") as f:
+                    keys = [tuple(int(v) for v in line.split(",")[:3]) for line in f if line.strip()]
+                if any(len(key) != 3 for key in keys):
+                    raise ValueError("每行须为 N,M,n")
+            else:
+                keys = table_keys(args.table_max_n)
+            count = build_table(args.build_table, keys)
+        except ValueError as e:
+            print(f"错误：无法建立查找表：{e}")
+            exit()
+        except OSError as e:
+            print(e)
+            exit()
+        size = os.path.getsize(f"{args.build_table}.values.npy") + os.path.getsize(f"{args.build_table}.index.npy")
+        print(f"查找表已写入 {args.build_table}.*.npy：{count} 个分布，{size / 2**20:.1f} MB，"
+              f"用时 {time.perf_counter() - start:.2f} 秒")
+        exit()
+
+    # 输入处理
+    try:
+        N = int(input("请输入总体数量 N: "))
+        M = int(input("请输入成功项数量 M: "))
+        n = int(input("请输入抽样数量 n: "))
+    except ValueError:
+        print("输入必须为整数")
+        exit()
+
+    # 参数验证
+    try:
+        check_params(N, M, n)
+    except ValueError as e:
+        print(e)
+        exit()
+
+    expectation, variance = mean_var(N, M, n)
+
+    if args.tail is not None:
+        # 只计算尾部
+        prob = tail(N, M, n, args.tail, not args.lower, args.mode)
+        sign = "≤" if args.lower else "≥"
+        if args.mode == "exact":
+            print(f"\nP(X{sign}{args.tail}) = {format_fraction(prob)} ≈ {float(prob):.10g}")
+        elif args.mode == "float":
+            print(f"\nP(X{sign}{args.tail}) = {prob:.10g}")
+        else:
+            print(f"\nln P(X{sign}{args.tail}) = {prob:.10g}")
+    else:
+        # 计算分布列
+        if args.window:
+            k_min, values = pmf_window(N, M, n, *args.window, args.mode)
+        else:
+            entry = None
+            if args.table and args.mode == "float":
+                try:
+                    entry = PMFTable(args.table).entry(N, M, n)
+                except OSError as e:
+                    print(e)
+                    exit()
+            k_min, values = entry if entry is not None else pmf_table(N, M, n, args.mode)
+
+        # 输出结果
+        print("\n超几何分布列:")
+        if args.mode == "exact":
+            for k, prob in enumerate(values, k_min):
+                print(f"P(X={k}) = {format_fraction(prob)}")
+        elif args.mode == "float":
+            for k, prob in enumerate(values, k_min):
+                print(f"P(X={k}) = {prob:.10g}")
+        else:
+            for k, log_prob in enumerate(values, k_min):
+                print(f"ln P(X={k}) = {log_prob:.10g}")
+
+        # 只输出窗口时概率和不为 1，不做验证
+        if not args.window:
+            if args.mode == "exact":
+                print(f"\n概率验证: {format_fraction(sum(values))} = 1")
+            elif args.mode == "float":
+                print(f"\n概率验证: {math.fsum(values):.12f} ≈ 1")
+            else:
+                print(f"\n概率验证: {math.fsum(math.exp(v) for v in values):.12f} ≈ 1")
+
+    print(f"期望值: {format_fraction(expectation)} ≈ {float(expectation):.4f}")
+    print(f"方差值: {format_fraction(variance)} ≈ {float(variance):.4f}")
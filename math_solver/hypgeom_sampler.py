@@ -0,0 +1,167 @@
+import sys
+import math
+import time
+
+try:
+    from . import hypgeom_dist
+except ImportError:
+    import hypgeom_dist
+
+# NumPy 的超几何抽样要求成功项与失败项都小于这个数
+NUMPY_LIMIT = 10**9
+METHODS = ("auto", "numpy", "inverse")
+
+
+def sample(N, M, n, size, seed=None, method="auto"):
+    """从超几何分布抽取 size 个样本，返回 int64 数组
+
+    numpy 方法直接调用 Generator.hypergeometric；
+    inverse 方法对浮点分布列的累积和做二分查找（逆变换法），N 不受限制。
+    auto 在 NumPy 支持的范围内用前者，否则用后者。
+    """
+    import numpy as np
+    hypgeom_dist.check_params(N, M, n)
+    if method not in METHODS:
+        raise ValueError(f"未知抽样方法: {method}，可选 {', '.join(METHODS)}")
+    rng = np.random.default_rng(seed)
+    if method == "auto":
+        method = "numpy" if max(M, N - M) < NUMPY_LIMIT else "inverse"
+
+    if method == "numpy":
+        return rng.hypergeometric(M, N - M, n, size=size).astype(np.int64)
+
+    k_min, values = hypgeom_dist.pmf_table(N, M, n, "float")
+    cdf = np.cumsum(values)
+    index = np.searchsorted(cdf, rng.random(size) * cdf[-1], side="right")
+    return k_min + np.minimum(index, len(cdf) - 1)
+
+
+def _chi2_sf(x, df):
+    """卡方分布上尾概率，即正则化不完全伽马函数 Q(df/2, x/2)，不依赖 SciPy"""
+    a, x = df / 2, x / 2
+    if x <= 0:
+        return 1.0
+    prefix = math.exp(-x + a * math.log(x) - math.lgamma(a))
+    if x < a + 1:
+        # 级数求 P，再取补
+        term = total = 1 / a
+        ap = a
+        for _ in range(10000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if term < total * 1e-15:
+                break
+        return max(0.0, 1 - total * prefix)
+    # 连分式求 Q（修正 Lentz 法）
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return prefix * h
+
+
+def goodness_of_fit(samples, N, M, n, min_expected=5.0, exact=True):
+    """卡方拟合优度检验：经验频数与精确分布列比较
+
+    期望频数不足 min_expected 的相邻取值合并成一组。
+    exact=True 时期望频数取自精确的 Fraction 分布列（与脚本输出一致），
+    否则用浮点分布列，适合支撑集很大的情形。
+    返回包含统计量、自由度、p 值和总变差距离的字典。
+    """
+    import numpy as np
+    k_min, values = hypgeom_dist.pmf_table(N, M, n, "exact" if exact else "float")
+    probs = np.array([float(p) for p in values])
+    samples = np.asarray(samples)
+    draws = samples.size
+    if draws == 0:
+        raise ValueError("样本为空")
+    offset = samples - k_min
+    if offset.min() < 0 or offset.max() >= len(probs):
+        raise ValueError("样本超出分布的取值范围")
+    observed = np.bincount(offset, minlength=len(probs))
+    expected = probs * draws
+
+    # 合并期望频数过小的相邻取值
+    groups_obs, groups_exp = [], []
+    acc_obs = acc_exp = 0.0
+    for o, e in zip(observed.tolist(), expected.tolist()):
+        acc_obs += o
+        acc_exp += e
+        if acc_exp >= min_expected:
+            groups_obs.append(acc_obs)
+            groups_exp.append(acc_exp)
+            acc_obs = acc_exp = 0.0
+    if groups_exp:
+        groups_obs[-1] += acc_obs
+        groups_exp[-1] += acc_exp
+    else:
+        groups_obs, groups_exp = [acc_obs], [acc_exp]
+
+    obs = np.array(groups_obs)
+    exp = np.array(groups_exp)
+    statistic = float(np.sum((obs - exp) ** 2 / exp))
+    df = len(obs) - 1
+    return {
+        "draws": draws,
+        "bins": len(obs),
+        "statistic": statistic,
+        "df": df,
+        "p_value": _chi2_sf(statistic, df) if df > 0 else 1.0,
+        "tv_distance": float(np.abs(observed / draws - probs).sum() / 2),
+        "k_min": k_min,
+        "observed": observed,
+        "expected": expected,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="超几何分布蒙特卡洛抽样与拟合检验")
+    parser.add_argument("N", type=int, help="总体数量")
+    parser.add_argument("M", type=int, help="成功项数量")
+    parser.add_argument("n", type=int, help="抽样数量")
+    parser.add_argument("--draws", type=int, default=10**6, help="抽样次数 (默认 1000000)")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    parser.add_argument("--method", choices=METHODS, default="auto", help="抽样方法 (默认 auto)")
+    parser.add_argument("--float", action="store_true", help="用浮点分布列做检验（支撑集很大时）")
+    parser.add_argument("--alpha", type=float, default=0.001, help="显著性水平，p 值低于它时返回 1 (默认 0.001)")
+    args = parser.parse_args()
+
+    try:
+        hypgeom_dist.check_params(args.N, args.M, args.n)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    samples = sample(args.N, args.M, args.n, args.draws, args.seed, args.method)
+    elapsed = time.perf_counter() - start
+    print(f"抽样 {args.draws} 次，用时 {elapsed:.3f} 秒，{args.draws / elapsed:,.0f} 次/秒")
+
+    result = goodness_of_fit(samples, args.N, args.M, args.n, exact=not args.float)
+    if len(result["expected"]) <= 30:
+        print(f"\n{'k':>6} {'观测频率':>12} {'理论概率':>12}")
+        for k, (o, e) in enumerate(zip(result["observed"], result["expected"]), result["k_min"]):
+            print(f"{k:>6} {o / args.draws:>16.6f} {e / args.draws:>16.6f}")
+
+    print(f"\n卡方统计量: {result['statistic']:.4f}（自由度 {result['df']}，{result['bins']} 组）")
+    print(f"p 值: {result['p_value']:.4g}")
+    print(f"总变差距离: {result['tv_distance']:.3e}")
+    print(f"样本均值: {samples.mean():.6f}，理论期望: {args.n * args.M / args.N:.6f}")
+    if result["p_value"] < args.alpha:
+        print(f"拟合检验未通过 (p < {args.alpha})")
+        sys.exit(1)
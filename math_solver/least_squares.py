@@ -0,0 +1,244 @@
+import sys
+import math
+import time
+from itertools import islice
+
+# 分块读取时每块的行数
+BLOCK_ROWS = 1 << 16
+METHODS = ("qr", "normal")
+
+
+class LeastSquares:
+    """分块累积的多元 / 多项式最小二乘
+
+    模型为 y = β0 + Σ_f Σ_{j=1..degree} β_{f,j} · x_f^j（各特征分别取幂，不含交叉项）。
+    设计矩阵从不整体保存：
+    qr 方法维护增广矩阵 [X | y] 的 R 因子，每来一块就对 [R; 新块] 再做一次 QR；
+    normal 方法累加 XᵀX、Xᵀy 与 yᵀy。两者内存都只与系数个数有关。
+    为改善高次项的条件数，各特征先按第一块的均值和标准差标准化，
+    求解后再换算回原始 x 的系数（标准误一并换算）。
+    """
+
+    def __init__(self, n_features=1, degree=1, intercept=True, method="qr"):
+        if n_features < 1 or degree < 1:
+            raise ValueError("特征数和多项式次数都至少为 1")
+        if method not in METHODS:
+            raise ValueError(f"未知方法: {method}，可选 {', '.join(METHODS)}")
+        self.n_features = n_features
+        self.degree = degree
+        self.intercept = intercept
+        self.method = method
+        self.p = n_features * degree + (1 if intercept else 0)
+        self.n = 0
+        self.shift = None       # 各特征的平移量与缩放量，取自第一块
+        self.scale = None
+        self.y_shift = 0.0
+        self.r = None           # qr: 增广 R 因子
+        self.xtx = None         # normal: 累积的 XᵀX、Xᵀy、yᵀy
+        self.xty = None
+        self.yty = 0.0
+        self.mean_y = 0.0       # 用于 R² 的 y 均值与离差平方和（Chan 合并公式）
+        self.syy = 0.0
+
+    def _design(self, X):
+        """标准化后的设计矩阵块"""
+        import numpy as np
+        Z = (X - self.shift) / self.scale
+        columns = [np.ones(len(X))] if self.intercept else []
+        for f in range(self.n_features):
+            power = np.ones(len(X))
+            for _ in range(self.degree):
+                power = power * Z[:, f]
+                columns.append(power)
+        return np.column_stack(columns)
+
+    def update(self, X, y):
+        """加入一块数据：X 为 (行数, 特征数) 数组，y 为长度相同的一维数组"""
+        import numpy as np
+        X = np.asarray(X, dtype=float).reshape(len(y), self.n_features)
+        y = np.asarray(y, dtype=float)
+        if len(y) == 0:
+            return
+        if self.shift is None:
+            # 不带截距时不能平移，只缩放
+            self.shift = X.mean(axis=0) if self.intercept else np.zeros(self.n_features)
+            spread = np.sqrt(((X - self.shift) ** 2).mean(axis=0))
+            self.scale = np.where(spread > 0, spread, 1.0)
+            self.y_shift = float(y.mean()) if self.intercept else 0.0
+
+        A = self._design(X)
+        b = y - self.y_shift
+        if self.method == "qr":
+            block = np.column_stack([A, b])
+            stacked = block if self.r is None else np.vstack([self.r, block])
+            self.r = np.linalg.qr(stacked, mode="r")
+        else:
+            if self.xtx is None:
+                self.xtx = np.zeros((self.p, self.p))
+                self.xty = np.zeros(self.p)
+            self.xtx += A.T @ A
+            self.xty += A.T @ b
+            self.yty += float(b @ b)
+
+        count = len(y)
+        mean_b = float(b.mean())
+        delta = mean_b - self.mean_y
+        total = self.n + count
+        self.syy += float(((b - mean_b) ** 2).sum()) + delta * delta * self.n * count / total
+        self.mean_y += delta * count / total
+        self.n = total
+
+    def _transform(self):
+        """标准化系数到原始系数的线性变换矩阵 T：β_原始 = T · β_标准化"""
+        import numpy as np
+        T = np.zeros((self.p, self.p))
+        offset = 1 if self.intercept else 0
+        if self.intercept:
+            T[0, 0] = 1.0
+        for f in range(self.n_features):
+            c, s = float(self.shift[f]), float(self.scale[f])
+            base = offset + f * self.degree
+            for j in range(1, self.degree + 1):
+                # ((x - c)/s)^j = Σ_i C(j,i) x^i (-c)^(j-i) / s^j
+                col = base + j - 1
+                for i in range(j + 1):
+                    a = math.comb(j, i) * (-c) ** (j - i) / s ** j
+                    if i == 0:
+                        T[0, col] += a
+                    else:
+                        T[base + i - 1, col] += a
+        return T
+
+    def solve(self):
+        """求解并返回结果字典
+
+        coef: 原始坐标下的系数（有截距时第一个为截距，之后依次为各特征的 1..degree 次项）
+        stderr / t: 标准误与 t 值；rss: 残差平方和；sigma: 残差标准误；
+        dof: 残差自由度；r2 / adj_r2: 决定系数与调整后的决定系数
+        """
+        import numpy as np
+        p = self.p
+        if self.n <= p:
+            raise ValueError(f"数据点数 ({self.n}) 必须多于系数个数 ({p})")
+        if self.method == "qr":
+            R = self.r[:p, :p]
+            qty = self.r[:p, p]
+            diag = np.abs(np.diag(R))
+            if diag.min() <= 1e-12 * diag.max():
+                raise ValueError("设计矩阵列线性相关，无法求解")
+            beta = np.linalg.solve(R, qty)
+            rss = float(self.r[p, p] ** 2) if self.r.shape[0] > p else 0.0
+            R_inv = np.linalg.inv(R)
+            xtx_inv = R_inv @ R_inv.T
+        else:
+            try:
+                L = np.linalg.cholesky(self.xtx)
+            except np.linalg.LinAlgError:
+                raise ValueError("设计矩阵列线性相关，无法求解") from None
+            beta = np.linalg.solve(L.T, np.linalg.solve(L, self.xty))
+            rss = max(self.yty - float(beta @ self.xty), 0.0)
+            L_inv = np.linalg.inv(L)
+            xtx_inv = L_inv.T @ L_inv
+
+        dof = self.n - p
+        sigma2 = rss / dof
+        T = self._transform()
+        coef = T @ beta
+        if self.intercept:
+            coef[0] += self.y_shift
+        cov = sigma2 * (T @ xtx_inv @ T.T)
+        stderr = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(stderr > 0, coef / stderr, np.inf)
+
+        if self.intercept:
+            r2 = 1.0 - rss / self.syy if self.syy > 0 else 1.0
+            adj_r2 = 1.0 - (1.0 - r2) * (self.n - 1) / dof
+        else:
+            # 无截距模型的 R² 按未中心化的总平方和计算
+            total = self.syy + self.n * self.mean_y ** 2
+            r2 = 1.0 - rss / total if total > 0 else 1.0
+            adj_r2 = 1.0 - (1.0 - r2) * self.n / dof
+        return {
+            "n": self.n,
+            "coef": coef,
+            "stderr": stderr,
+            "t": t,
+            "rss": rss,
+            "sigma": math.sqrt(sigma2),
+            "dof": dof,
+            "r2": r2,
+            "adj_r2": adj_r2,
+        }
+
+    def names(self):
+        """各系数的名称，与 solve() 的 coef 顺序一致"""
+        names = ["截距"] if self.intercept else []
+        for f in range(self.n_features):
+            x = f"x{f + 1}" if self.n_features > 1 else "x"
+            names += [x if j == 1 else f"{x}^{j}" for j in range(1, self.degree + 1)]
+        return names
+
+
+def iter_csv_rows(path, block_rows=BLOCK_ROWS, skip_header=False):
+    """分块读取 CSV，每行为 x1,...,xk,y，每次产生一个 (行数, k+1) 数组"""
+    import numpy as np
+    with open(path, encoding="utf-8") as f:
+        if skip_header:
+            f.readline()
+        while True:
+            lines = [line for line in islice(f, block_rows) if line.strip()]
+            if not lines:
+                break
+            try:
+                block = np.loadtxt(lines, delimiter=",", ndmin=2)
+            except ValueError as e:
+                raise ValueError(f"错误：文件 '{path}' 中有格式不正确的行：{e}") from None
+            yield block
+
+
+def fit_csv(path, degree=1, intercept=True, method="qr", block_rows=BLOCK_ROWS, skip_header=False):
+    """分块拟合整个 CSV 文件，特征数由第一块的列数决定，返回 LeastSquares"""
+    model = None
+    for block in iter_csv_rows(path, block_rows, skip_header):
+        if block.shape[1] < 2:
+            raise ValueError("错误：每行至少需要一个特征列和一个 y 列")
+        if model is None:
+            model = LeastSquares(block.shape[1] - 1, degree, intercept, method)
+        elif block.shape[1] != model.n_features + 1:
+            raise ValueError("错误：各行的列数不一致")
+        model.update(block[:, :-1], block[:, -1])
+    if model is None:
+        raise ValueError("错误：文件中没有数据")
+    return model
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="多元 / 多项式最小二乘拟合")
+    parser.add_argument("path", help="CSV 数据文件，每行为 x1,...,xk,y")
+    parser.add_argument("--degree", type=int, default=1, help="多项式次数 (默认 1)")
+    parser.add_argument("--no-intercept", action="store_true", help="不拟合截距")
+    parser.add_argument("--method", choices=METHODS, default="qr",
+                        help="qr 逐块 QR 更新（数值稳定）；normal 累加正规方程（更快）(默认 qr)")
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS, help=f"每块行数 (默认 {BLOCK_ROWS})")
+    parser.add_argument("--skip-header", action="store_true", help="跳过第一行表头")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        model = fit_csv(args.path, args.degree, not args.no_intercept, args.method,
+                        args.block_rows, args.skip_header)
+        result = model.solve()
+    except (ValueError, OSError) as e:
+        print(e)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"数据点数：{result['n']}，用时 {elapsed:.3f} 秒")
+    print(f"\n{'项':>8} {'系数':>16} {'标准误':>14} {'t 值':>10}")
+    for name, c, se, t in zip(model.names(), result["coef"], result["stderr"], result["t"]):
+        print(f"{name:>8} {c:>18.6g} {se:>16.4g} {t:>12.3f}")
+    print(f"\nR² = {result['r2']:.6f}，调整后 R² = {result['adj_r2']:.6f}")
+    print(f"残差平方和 = {result['rss']:.6g}，残差标准误 = {result['sigma']:.6g}（自由度 {result['dof']}）")
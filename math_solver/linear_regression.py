@@ -1,51 +1,704 @@
-# 提示用户输入数据点
-print("请输入数据点，格式为 x,y，多个点用空格分隔（例如：1,2 3,4 5,6）：")
-data_input = input().strip()
+import os
+import sys
+import io
+import json
+import time
+import warnings
+from math import gcd
+from decimal import Decimal
+from fractions import Fraction
+from collections import deque
 
-if not data_input:
-    print("错误：未输入数据。")
-    exit()
+# 流式读取时每次读入的字符数
+CHUNK_SIZE = 1 << 20
+# NumPy 分块读取时每块的字节数 / 行数
+BLOCK_BYTES = 1 << 26
+BLOCK_ROWS = 1 << 22
+FORMATS = ("text", "csv", "binary")
 
-# 解析输入数据
-points = []
-for item in data_input.split():
+
+class RegressionAccumulator:
+    """一遍扫描的一元线性回归统计量
+
+    只保存点数、均值和离差平方和/离差积和，内存占用与点数无关。
+    更新采用 Welford 的增量形式，避免 n·Σx² - (Σx)² 这类大数相减造成的精度损失；
+    数据先减去第一个点（shift），x 都在 1e9 附近时均值也不会丢掉小数部分。
+    """
+
+    __slots__ = ("n", "shift_x", "shift_y", "mean_x", "mean_y", "sxx", "syy", "sxy")
+
+    def __init__(self):
+        self.n = 0
+        self.shift_x = 0.0
+        self.shift_y = 0.0
+        self.mean_x = 0.0   # 平移后的均值，实际均值为 shift_x + mean_x
+        self.mean_y = 0.0
+        self.sxx = 0.0      # Σ(x - x̄)²
+        self.syy = 0.0      # Σ(y - ȳ)²
+        self.sxy = 0.0      # Σ(x - x̄)(y - ȳ)
+
+    def add(self, x, y):
+        """加入一个点"""
+        self.update((x,), (y,))
+
+    def update(self, xs, ys):
+        """加入一批点"""
+        if self.n == 0 and len(xs):
+            self.shift_x, self.shift_y = float(xs[0]), float(ys[0])
+        n, mean_x, mean_y = self.n, self.mean_x, self.mean_y
+        sxx, syy, sxy = self.sxx, self.syy, self.sxy
+        kx, ky = self.shift_x, self.shift_y
+        for x, y in zip(xs, ys):
+            x -= kx
+            y -= ky
+            n += 1
+            dx = x - mean_x
+            dy = y - mean_y
+            mean_x += dx / n
+            mean_y += dy / n
+            sxx += dx * (x - mean_x)
+            syy += dy * (y - mean_y)
+            sxy += dx * (y - mean_y)
+        self.n, self.mean_x, self.mean_y = n, mean_x, mean_y
+        self.sxx, self.syy, self.sxy = sxx, syy, sxy
+
+    def remove(self, x, y):
+        """移除一个之前加入过的点（Welford 更新的逆运算）"""
+        if self.n <= 1:
+            if self.n == 0:
+                raise ValueError("没有可以移除的点")
+            self.__init__()
+            return
+        x -= self.shift_x
+        y -= self.shift_y
+        n = self.n - 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        # 先还原均值，再减去该点对离差和的贡献
+        mean_x = self.mean_x - dx / n
+        mean_y = self.mean_y - dy / n
+        self.sxx -= (x - mean_x) * dx
+        self.syy -= (y - mean_y) * dy
+        self.sxy -= (x - mean_x) * dy
+        self.n, self.mean_x, self.mean_y = n, mean_x, mean_y
+
+    def update_arrays(self, xs, ys):
+        """用 NumPy 向量化地加入一批点
+
+        先对这一批求均值和离差积和，再按 Chan 等人的合并公式并入已有统计量。
+        """
+        import numpy as np
+        count = len(xs)
+        if count == 0:
+            return
+        if self.n == 0:
+            self.shift_x, self.shift_y = float(xs[0]), float(ys[0])
+        xs = np.asarray(xs, dtype=float) - self.shift_x
+        ys = np.asarray(ys, dtype=float) - self.shift_y
+        mean_x, mean_y = float(xs.mean()), float(ys.mean())
+        dx, dy = xs - mean_x, ys - mean_y
+        self._combine(count, mean_x, mean_y, float(dx @ dx), float(dy @ dy), float(dx @ dy))
+
+    def _combine(self, n_b, mean_x_b, mean_y_b, sxx_b, syy_b, sxy_b):
+        """并入另一组（同一平移量下的）统计量"""
+        n_a = self.n
+        n = n_a + n_b
+        delta_x = mean_x_b - self.mean_x
+        delta_y = mean_y_b - self.mean_y
+        weight = n_a * n_b / n
+        self.mean_x += delta_x * n_b / n
+        self.mean_y += delta_y * n_b / n
+        self.sxx += sxx_b + delta_x * delta_x * weight
+        self.syy += syy_b + delta_y * delta_y * weight
+        self.sxy += sxy_b + delta_x * delta_y * weight
+        self.n = n
+
+    def merge(self, other):
+        """并入另一个累加器，结果与两组数据放在一起计算相同；返回 self
+
+        合并满足结合律，各分片的结果可以按任意分组合并。
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+        # 先把对方的均值换算到本对象的平移量下
+        self._combine(other.n,
+                      other.mean_x + (other.shift_x - self.shift_x),
+                      other.mean_y + (other.shift_y - self.shift_y),
+                      other.sxx, other.syy, other.sxy)
+        return self
+
+    def to_dict(self):
+        """可 JSON 序列化的状态"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        """从 to_dict 的结果恢复"""
+        acc = cls()
+        for name in cls.__slots__:
+            setattr(acc, name, data[name])
+        return acc
+
+    def fit(self):
+        """返回 (斜率 m, 截距 b)"""
+        if self.n < 2:
+            raise ValueError("错误：至少需要两个数据点才能计算线性回归。")
+        if self.sxx == 0:
+            raise ValueError("错误：所有 x 值相同，无法计算斜率。")
+        m = self.sxy / self.sxx
+        return m, (self.shift_y + self.mean_y) - m * (self.shift_x + self.mean_x)
+
+    def r_squared(self):
+        """决定系数 R²"""
+        if self.syy == 0:
+            return 1.0
+        return self.sxy * self.sxy / (self.sxx * self.syy)
+
+
+class SlidingWindowRegression:
+    """只对最近 window 个点做回归，适合实时数据
+
+    新点加入、最旧的点移出都是 O(1) 的增量更新。
+    增删交替会慢慢积累舍入误差，所以每移出 window 个点就用窗口内的数据重算一次，
+    摊还后仍是 O(1)。
+    """
+
+    def __init__(self, window):
+        if window < 2:
+            raise ValueError("窗口至少要包含两个点")
+        self.window = window
+        self.points = deque()
+        self.acc = RegressionAccumulator()
+        self._removed = 0
+
+    def add(self, x, y):
+        """加入一个点，窗口满时移出最旧的点"""
+        self.points.append((x, y))
+        self.acc.add(x, y)
+        if len(self.points) > self.window:
+            self.acc.remove(*self.points.popleft())
+            self._removed += 1
+            if self._removed >= self.window:
+                self._rebuild()
+
+    def update(self, xs, ys):
+        """依次加入一批点"""
+        for x, y in zip(xs, ys):
+            self.add(x, y)
+
+    def _rebuild(self):
+        """用窗口内的点重新计算统计量，消除累积误差"""
+        self.acc = RegressionAccumulator()
+        self.acc.update([p[0] for p in self.points], [p[1] for p in self.points])
+        self._removed = 0
+
+    def fit(self):
+        """当前窗口的 (斜率 m, 截距 b)"""
+        return self.acc.fit()
+
+
+def rolling_fit(batches, window):
+    """对 (xs, ys) 批次流做滑动窗口回归，每批之后产生 (窗口点数, m, b)
+
+    窗口内点数不足或 x 全部相同时 m、b 为 nan。
+    """
+    model = SlidingWindowRegression(window)
+    for xs, ys in batches:
+        model.update(xs, ys)
+        try:
+            m, b = model.fit()
+        except ValueError:
+            m = b = float("nan")
+        yield len(model.points), m, b
+
+
+class ExactRegression:
+    """精确的有理数线性回归
+
+    四个和 Σx、Σy、Σxy、Σx² 各自保存为“整数分子 / 公共分母”，
+    加入新项时只在分母不整除时扩大公共分母，不做逐步约分（Fraction 每步约分是主要开销）。
+    输入是有限小数时分母都是 10 的幂，公共分母很快就稳定下来。
+    """
+
+    __slots__ = ("n", "sums")
+
+    def __init__(self):
+        self.n = 0
+        # Σx、Σy、Σxy、Σx² 的 [分子, 分母]
+        self.sums = [[0, 1], [0, 1], [0, 1], [0, 1]]
+
+    @staticmethod
+    def _add(acc, num, den):
+        """acc += num/den，保持 acc 的分母为公共分母"""
+        if acc[1] % den:
+            scale = den // gcd(acc[1], den)
+            acc[0] *= scale
+            acc[1] *= scale
+        acc[0] += num * (acc[1] // den)
+
+    def update(self, xs, ys):
+        """加入一批点，xs、ys 中的每个值为 (分子, 分母) 整数对"""
+        add = self._add
+        sx, sy, sxy, sx2 = self.sums
+        for (a, b), (c, d) in zip(xs, ys):
+            add(sx, a, b)
+            add(sy, c, d)
+            add(sxy, a * c, b * d)
+            add(sx2, a * a, b * b)
+        self.n += len(xs)
+
+    def fit(self):
+        """返回精确的 (斜率 m, 截距 b)，均为 Fraction"""
+        if self.n < 2:
+            raise ValueError("错误：至少需要两个数据点才能计算线性回归。")
+        n = self.n
+        sx, sy, sxy, sx2 = (Fraction(num, den) for num, den in self.sums)
+        denominator = n * sx2 - sx * sx
+        if denominator == 0:
+            raise ValueError("错误：所有 x 值相同，无法计算斜率。")
+        m = (n * sxy - sx * sy) / denominator
+        return m, (sy - m * sx) / n
+
+
+def parse_rational(text):
+    """把 "1.25"、"-3e2"、"7/3" 这样的文本精确解析为 (分子, 分母) 整数对"""
+    if "/" in text:
+        return Fraction(text).as_integer_ratio()
+    return Decimal(text).as_integer_ratio()
+
+
+def parse_exact_point(item):
+    """解析一个 "x,y" 数据项，坐标保持为精确的有理数"""
+    if ',' not in item:
+        raise ValueError(f"错误：输入项 '{item}' 格式不正确，请使用逗号分隔的 x,y 格式。")
+    parts = item.split(',')
+    if len(parts) != 2:
+        raise ValueError(f"错误：输入项 '{item}' 格式不正确，应包含且仅包含一个逗号。")
+    try:
+        return parse_rational(parts[0]), parse_rational(parts[1])
+    except (ArithmeticError, ValueError):
+        raise ValueError(f"错误：输入项 '{item}' 不是有限的有理数。") from None
+
+
+def format_fraction(f):
+    """格式化分数输出，非整数时加括号"""
+    if f.denominator == 1:
+        return f"{f.numerator}"
+    return f"({f.numerator}/{f.denominator})"
+
+
+def parse_point(item):
+    """解析一个 "x,y" 数据项"""
     # 检查格式是否正确
     if ',' not in item:
-        print(f"错误：输入项 '{item}' 格式不正确，请使用逗号分隔的 x,y 格式。")
-        exit()
+        raise ValueError(f"错误：输入项 '{item}' 格式不正确，请使用逗号分隔的 x,y 格式。")
     parts = item.split(',')
     if len(parts) != 2:
-        print(f"错误：输入项 '{item}' 格式不正确，应包含且仅包含一个逗号。")
-        exit()
+        raise ValueError(f"错误：输入项 '{item}' 格式不正确，应包含且仅包含一个逗号。")
     # 转换为浮点数
     try:
-        x = float(parts[0])
-        y = float(parts[1])
-        points.append((x, y))
+        return float(parts[0]), float(parts[1])
     except ValueError:
-        print(f"错误：输入项 '{item}' 包含非数字字符。")
+        raise ValueError(f"错误：输入项 '{item}' 包含非数字字符。") from None
+
+
+def iter_chunks(stream, chunk_size=CHUNK_SIZE, parse=parse_point):
+    """从文本流分块读取数据点，每次产生 (xs, ys) 两个列表
+
+    数据项之间可以用空格或换行分隔；块边界上被截断的数据项留到下一块再解析。
+    parse 为单个数据项的解析函数，精确模式下用 parse_exact_point。
+    """
+    rest = ""
+    while True:
+        text = stream.read(chunk_size)
+        if not text:
+            break
+        items = (rest + text).split()
+        # 块末尾不是空白时，最后一项可能不完整
+        rest = items.pop() if items and not text[-1].isspace() else ""
+        if items:
+            points = [parse(item) for item in items]
+            yield [p[0] for p in points], [p[1] for p in points]
+    if rest:
+        x, y = parse(rest)
+        yield [x], [y]
+
+
+def iter_lines(stream):
+    """逐行读取数据点，每行产生一批 (xs, ys)；适合实时输入，不会等满一整块"""
+    for line in stream:
+        items = line.split()
+        if items:
+            points = [parse_point(item) for item in items]
+            yield [p[0] for p in points], [p[1] for p in points]
+
+
+def fit_stream(stream, chunk_size=CHUNK_SIZE, exact=False):
+    """一遍读完文本流，返回累加器；exact 为真时返回 ExactRegression"""
+    if exact:
+        acc = ExactRegression()
+        for xs, ys in iter_chunks(stream, chunk_size, parse_exact_point):
+            acc.update(xs, ys)
+        return acc
+    acc = RegressionAccumulator()
+    for xs, ys in iter_chunks(stream, chunk_size):
+        acc.update(xs, ys)
+    return acc
+
+
+def _last_boundary(block):
+    """块中最后一个可以截断的位置（该字节及之前的部分先解析），没有时返回 -1
+
+    优先取最后一个换行，保证 "x, y" 这类逗号后带空格的行不被切开；
+    整块没有换行时才退而取空白，但跳过紧挨逗号的空白。
+    """
+    cut = block.rfind(b"\n")
+    if cut >= 0:
+        return cut
+    cut = len(block)
+    while True:
+        cut = max(block.rfind(b" ", 0, cut), block.rfind(b"\t", 0, cut), block.rfind(b"\r", 0, cut))
+        if cut < 0 or not (block[:cut].rstrip().endswith(b",") or block[cut + 1:].lstrip().startswith(b",")):
+            return cut
+
+
+def iter_csv_blocks(path, block_bytes=BLOCK_BYTES, skip_header=False, start=0, end=None):
+    """用 NumPy 分块解析 x,y 文本文件的 [start, end) 字节，每次产生 (x 数组, y 数组)
+
+    每块读入 block_bytes 字节，在最后一个换行处截断（没有换行时在空白处），剩余部分并入下一块；
+    逗号换成空格后由 np.fromstring 一次解析整块，不再逐项 split/float。
+    """
+    import numpy as np
+    with open(path, "rb") as f:
+        f.seek(start)
+        if skip_header and start == 0:
+            f.readline()
+        remaining = float("inf") if end is None else end - f.tell()
+        rest = b""
+        while True:
+            data = f.read(int(min(block_bytes, remaining))) if remaining > 0 else b""
+            remaining -= len(data)
+            block = rest + data
+            if data:
+                cut = _last_boundary(block)
+                if cut < 0:
+                    rest = block
+                    continue
+                block, rest = block[:cut + 1], block[cut + 1:]
+            if not block.strip():
+                if data:
+                    continue
+                break
+            # 解析中途遇到非数字时 fromstring 会报错或提前停止，后者用逗号个数核对
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", DeprecationWarning)
+                    values = np.fromstring(block.replace(b",", b" "), dtype=float, sep=" ")
+            except ValueError:
+                values = None
+            if values is None or values.size != 2 * block.count(b",") or values.size % 2:
+                raise ValueError(f"错误：文件 '{path}' 中有格式不正确的数据项。")
+            pairs = values.reshape(-1, 2)
+            yield pairs[:, 0], pairs[:, 1]
+            if not data:
+                break
+
+
+def iter_binary_blocks(path, block_rows=BLOCK_ROWS, start=0, end=None):
+    """以内存映射方式读取 float64 (x, y) 对组成的二进制文件的 [start, end) 行，每次产生一块视图"""
+    import numpy as np
+    size = os.path.getsize(path)
+    if size % 16:
+        raise ValueError(f"错误：文件 '{path}' 的大小不是 16 字节（一对 float64）的整数倍。")
+    if size == 0:
+        return
+    pairs = np.memmap(path, dtype="<f8", mode="r").reshape(-1, 2)
+    end = len(pairs) if end is None else min(end, len(pairs))
+    for row in range(start, end, block_rows):
+        block = pairs[row:min(row + block_rows, end)]
+        yield block[:, 0], block[:, 1]
+
+
+def fit_file(path, fmt="csv", block_size=None, skip_header=False):
+    """按格式分块读取整个文件，返回 (累加器, 用时秒数)"""
+    start = time.perf_counter()
+    acc = RegressionAccumulator()
+    if fmt == "text":
+        with open(path, encoding="utf-8") as f:
+            for xs, ys in iter_chunks(f, block_size or CHUNK_SIZE):
+                acc.update(xs, ys)
+    elif fmt == "csv":
+        for xs, ys in iter_csv_blocks(path, block_size or BLOCK_BYTES, skip_header):
+            acc.update_arrays(xs, ys)
+    elif fmt == "binary":
+        for xs, ys in iter_binary_blocks(path, block_size or BLOCK_ROWS):
+            acc.update_arrays(xs, ys)
+    else:
+        raise ValueError(f"未知格式: {fmt}，可选 {', '.join(FORMATS)}")
+    return acc, time.perf_counter() - start
+
+
+# ---------------- 多进程分片 ----------------
+
+def _newline_after(f, pos):
+    """pos 处或之后第一个换行的位置，用作分片边界，保证行不被截断；其后没有换行时返回文件末尾"""
+    f.seek(pos)
+    while True:
+        data = f.read(1 << 16)
+        if not data:
+            return f.tell()
+        i = data.find(b"\n")
+        if i >= 0:
+            return pos + i
+        pos += len(data)
+
+
+def shard_ranges(path, fmt, shards, skip_header=False):
+    """把文件切成最多 shards 段，返回 [(start, end)]
+
+    csv 按字节切分并对齐到换行处，binary 按行切分。
+    """
+    size = os.path.getsize(path)
+    if fmt == "binary":
+        if size % 16:
+            raise ValueError(f"错误：文件 '{path}' 的大小不是 16 字节（一对 float64）的整数倍。")
+        rows = size // 16
+        bounds = sorted({rows * i // shards for i in range(shards + 1)})
+    else:
+        with open(path, "rb") as f:
+            header = len(f.readline()) if skip_header else 0
+            bounds = sorted({0, size} | {_newline_after(f, max(size * i // shards, header))
+                                         for i in range(1, shards)})
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def fit_shard(task):
+    """子进程中拟合一个分片，返回可 JSON 序列化的结果"""
+    start_time = time.perf_counter()
+    acc = RegressionAccumulator()
+    if task["format"] == "binary":
+        blocks = iter_binary_blocks(task["path"], task["block_size"] or BLOCK_ROWS, task["start"], task["end"])
+    else:
+        blocks = iter_csv_blocks(task["path"], task["block_size"] or BLOCK_BYTES, task["skip_header"],
+                                 task["start"], task["end"])
+    for xs, ys in blocks:
+        acc.update_arrays(xs, ys)
+    return dict(task, state=acc.to_dict(), seconds=time.perf_counter() - start_time)
+
+
+def _shard_key(task):
+    return (task["path"], task["size"], task["format"], task["skip_header"], task["start"], task["end"])
+
+
+def _load_checkpoint(path):
+    """读取检查点中已完成的分片，截掉中断时写了一半的最后一行"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+            data = data[:end]
+    records = [json.loads(line) for line in data.decode("utf-8").splitlines() if line.strip()]
+    return {_shard_key(r): r for r in records}
+
+
+def fit_parallel(path, fmt="csv", shards=None, workers=None, checkpoint=None,
+                 skip_header=False, block_size=None):
+    """把文件切片后用进程池并行拟合，再按顺序合并，返回 (累加器, 用时秒数)
+
+    指定 checkpoint 时每完成一个分片就把它的状态追加写入（JSONL），
+    中断后用同一参数重新运行会跳过已完成的分片。
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    if fmt not in ("csv", "binary"):
+        raise ValueError("错误：多进程拟合只支持 csv/binary 格式。")
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count()
+    shards = shards or 4 * workers
+    path = os.path.abspath(path)
+    size = os.path.getsize(path)
+    tasks = [{"path": path, "size": size, "format": fmt, "skip_header": skip_header,
+              "block_size": block_size, "start": start, "end": end}
+             for start, end in shard_ranges(path, fmt, shards, skip_header)]
+
+    done = _load_checkpoint(checkpoint)
+    results = {key: r for key, r in done.items() if key in {_shard_key(t) for t in tasks}}
+    pending = [t for t in tasks if _shard_key(t) not in results]
+    if checkpoint:
+        print(f"共 {len(tasks)} 个分片，已完成 {len(tasks) - len(pending)} 个，待计算 {len(pending)} 个")
+
+    log = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fit_shard, t) for t in pending]
+            for future in as_completed(futures):
+                r = future.result()
+                results[_shard_key(r)] = r
+                if log:
+                    log.write(json.dumps(r, ensure_ascii=False) + "\n")
+                    log.flush()
+    finally:
+        if log:
+            log.close()
+
+    # 按分片顺序合并，结果与分片完成的先后无关
+    acc = RegressionAccumulator()
+    for t in tasks:
+        acc.merge(RegressionAccumulator.from_dict(results[_shard_key(t)]["state"]))
+    return acc, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="一元线性回归")
+    parser.add_argument("path", nargs="?",
+                        help="数据文件，每项为 x,y，用空格或换行分隔；'-' 表示标准输入。不指定时交互输入一行")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"每次读入的字符数 (默认 {CHUNK_SIZE})")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+                        help="text 逐项解析；csv 用 NumPy 分块解析；binary 内存映射 float64 (x, y) 对 (默认 text)")
+    parser.add_argument("--block-size", type=int,
+                        help=f"csv 每块字节数 (默认 {BLOCK_BYTES})，binary 每块行数 (默认 {BLOCK_ROWS})")
+    parser.add_argument("--skip-header", action="store_true", help="csv 格式跳过第一行表头")
+    parser.add_argument("--exact", action="store_true",
+                        help="精确模式：按有理数计算，输出分数形式的斜率和截距（支持 1/3 这样的输入）")
+    parser.add_argument("--window", type=int, metavar="W",
+                        help="滑动窗口回归：逐行读取，每行之后输出最近 W 个点的拟合结果")
+    parser.add_argument("--robust", choices=("theil-sen", "ransac"),
+                        help="稳健回归：Theil–Sen（两两斜率中位数）或 RANSAC，抵抗离群点")
+    parser.add_argument("--threshold", type=float, help="RANSAC 内点的残差阈值 (默认为 Theil–Sen 初步拟合残差 MAD 的 2.5×1.4826 倍)")
+    parser.add_argument("--iterations", type=int, default=1000, help="RANSAC 候选直线数 (默认 1000)")
+    parser.add_argument("--sample-size", type=int, default=100000, help="RANSAC 评分用的最大点数 (默认 100000)")
+    parser.add_argument("--seed", type=int, help="稳健回归的随机种子")
+    parser.add_argument("--workers", type=int, help="用多进程分片拟合 csv/binary 文件，指定进程数")
+    parser.add_argument("--shards", type=int, help="分片数 (默认进程数的 4 倍)")
+    parser.add_argument("--checkpoint", help="多进程拟合的检查点文件 (JSONL)，中断后可从这里继续")
+    parser.add_argument("--save-state", metavar="FILE", help="把最终的统计量状态保存为 JSON")
+    parser.add_argument("--merge", nargs="+", metavar="FILE",
+                        help="合并若干 --save-state 保存的状态并输出拟合结果（用于分布式计算）")
+    args = parser.parse_args()
+
+    if args.window:
+        if args.path is None or args.path == "-":
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(args.path, encoding="utf-8")
+            except OSError as e:
+                print(f"错误：无法打开文件：{e}")
+                exit()
+        try:
+            with stream:
+                for count, m, b in rolling_fit(iter_lines(stream), args.window):
+                    print(f"窗口点数：{count}，y = {m:.4f}x + {b:.4f}", flush=True)
+        except ValueError as e:
+            print(e)
         exit()
 
-# 检查数据点数量
-n = len(points)
-if n < 2:
-    print("错误：至少需要两个数据点才能计算线性回归。")
-    exit()
-
-# 计算统计量
-sum_x = sum(x for x, y in points)
-sum_y = sum(y for x, y in points)
-sum_xy = sum(x * y for x, y in points)
-sum_x2 = sum(x ** 2 for x, y in points)
-
-# 计算斜率 (m) 和截距 (b)
-denominator = n * sum_x2 - sum_x ** 2
-if denominator == 0:
-    print("错误：所有 x 值相同，无法计算斜率。")
-    exit()
-
-m = (n * sum_xy - sum_x * sum_y) / denominator
-b = (sum_y - m * sum_x) / n
-
-# 输出结果
-print(f"\n线性回归方程为：y = {m:.4f}x + {b:.4f}")
+    if args.robust:
+        try:
+            from . import robust_regression
+        except ImportError:
+            import robust_regression
+        if args.path is None or args.path == "-":
+            print("错误：稳健回归需要指定数据文件。")
+            exit()
+        try:
+            start = time.perf_counter()
+            xs, ys = robust_regression.load_points(args.path, args.format, args.skip_header)
+            if args.robust == "theil-sen":
+                m, b = robust_regression.theil_sen(xs, ys, seed=args.seed)
+                extra = ""
+            else:
+                result = robust_regression.ransac(xs, ys, args.threshold, args.iterations,
+                                                  args.sample_size, args.workers, args.seed)
+                m, b = result["slope"], result["intercept"]
+                extra = (f"，内点 {result['inliers']} 个 ({result['inlier_ratio']:.1%})，"
+                         f"阈值 {result['threshold']:.4g}")
+            elapsed = time.perf_counter() - start
+        except (ValueError, OSError) as e:
+            print(e)
+            exit()
+        print(f"数据点数：{len(xs)}，用时 {elapsed:.3f} 秒{extra}")
+        print(f"\n线性回归方程为：y = {m:.4f}x + {b:.4f}")
+        exit()
+
+    if args.merge or args.format != "text" or args.workers:
+        try:
+            if args.merge:
+                start = time.perf_counter()
+                acc = RegressionAccumulator()
+                for state_path in args.merge:
+                    with open(state_path, encoding="utf-8") as f:
+                        acc.merge(RegressionAccumulator.from_dict(json.load(f)))
+                elapsed = time.perf_counter() - start
+            elif args.path is None or args.path == "-":
+                raise ValueError("错误：csv/binary 格式和多进程拟合需要指定数据文件。")
+            elif args.workers or args.checkpoint:
+                fmt = "csv" if args.format == "text" else args.format
+                acc, elapsed = fit_parallel(args.path, fmt, args.shards, args.workers, args.checkpoint,
+                                            args.skip_header, args.block_size)
+            else:
+                acc, elapsed = fit_file(args.path, args.format, args.block_size, args.skip_header)
+            m, b = acc.fit()
+        except (ValueError, OSError, KeyError) as e:
+            print(e)
+            exit()
+        if args.save_state:
+            with open(args.save_state, "w", encoding="utf-8") as f:
+                json.dump(acc.to_dict(), f)
+        rate = acc.n / elapsed if elapsed > 0 else float("inf")
+        print(f"数据点数：{acc.n}，R² = {acc.r_squared():.6f}")
+        print(f"用时 {elapsed:.3f} 秒，{rate:,.0f} 行/秒")
+        print(f"\n线性回归方程为：y = {m:.4f}x + {b:.4f}")
+        exit()
+
+    if args.path is None:
+        # 提示用户输入数据点
+        print("请输入数据点，格式为 x,y，多个点用空格分隔（例如：1,2 3,4 5,6）：")
+        data_input = input().strip()
+
+        if not data_input:
+            print("错误：未输入数据。")
+            exit()
+        stream = io.StringIO(data_input)
+    elif args.path == "-":
+        stream = sys.stdin
+    else:
+        try:
+            stream = open(args.path, encoding="utf-8")
+        except OSError as e:
+            print(f"错误：无法打开文件：{e}")
+            exit()
+
+    # 一遍扫描计算统计量，再求斜率 (m) 和截距 (b)
+    try:
+        with stream:
+            acc = fit_stream(stream, args.chunk_size, args.exact)
+        m, b = acc.fit()
+    except ValueError as e:
+        print(e)
+        exit()
+
+    if args.exact:
+        if args.path is not None:
+            print(f"数据点数：{acc.n}")
+        print(f"\n线性回归方程为：y = {format_fraction(m)}x + {format_fraction(b)}")
+        print(f"约为：y = {float(m):.4f}x + {float(b):.4f}")
+        exit()
+
+    if args.save_state:
+        with open(args.save_state, "w", encoding="utf-8") as f:
+            json.dump(acc.to_dict(), f)
+
+    # 输出结果
+    if args.path is not None:
+        print(f"数据点数：{acc.n}，R² = {acc.r_squared():.6f}")
+    print(f"\n线性回归方程为：y = {m:.4f}x + {b:.4f}")
@@ -0,0 +1,148 @@
+import os
+
+try:
+    from . import linear_regression
+except ImportError:
+    import linear_regression
+
+# 点数不超过这个值时 Theil–Sen 精确计算全部 n(n-1)/2 个斜率
+EXACT_LIMIT = 2000
+# RANSAC 评分时最多使用的点数，每批同时评估的候选直线数
+SAMPLE_SIZE = 100000
+CANDIDATE_BATCH = 32
+# 默认内点阈值 = THRESHOLD_SCALE × 1.4826 × 残差的 MAD（1.4826·MAD 是正态噪声标准差的稳健估计）
+THRESHOLD_SCALE = 2.5
+METHODS = ("theil-sen", "ransac")
+
+
+def theil_sen(x, y, pairs=None, seed=None):
+    """Theil–Sen 估计：斜率取两两斜率的中位数，截距取 y - m·x 的中位数，返回 (m, b)
+
+    n ≤ EXACT_LIMIT 时精确计算所有点对；否则随机抽取 pairs 个点对（默认 2n），
+    取其斜率中位数，代价 O(n log n)，所得斜率在全部斜率中的分位数偏差约为 1/√pairs。
+    x 相同的点对没有斜率，不参与计算。
+    """
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 2:
+        raise ValueError("错误：至少需要两个数据点才能计算线性回归。")
+
+    if n <= EXACT_LIMIT and pairs is None:
+        i, j = np.triu_indices(n, 1)
+    else:
+        rng = np.random.default_rng(seed)
+        count = pairs or 2 * n
+        i = rng.integers(0, n, count)
+        j = rng.integers(0, n, count)
+    dx = x[j] - x[i]
+    valid = dx != 0
+    if not valid.any():
+        raise ValueError("错误：所有 x 值相同，无法计算斜率。")
+    m = float(np.median((y[j] - y[i])[valid] / dx[valid]))
+    return m, float(np.median(y - m * x))
+
+
+def _ransac_worker(task):
+    """评估一批随机候选直线，返回 (内点数, m, b)"""
+    import numpy as np
+    x, y, threshold, iterations, seed = task
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    best = (-1, 0.0, 0.0)
+    for start in range(0, iterations, CANDIDATE_BATCH):
+        k = min(CANDIDATE_BATCH, iterations - start)
+        i = rng.integers(0, n, k)
+        j = rng.integers(0, n, k)
+        dx = x[j] - x[i]
+        ok = dx != 0
+        if not ok.any():
+            continue
+        m = (y[j] - y[i])[ok] / dx[ok]
+        b = y[i][ok] - m * x[i][ok]
+        # 每行对应一条候选直线
+        inliers = (np.abs(y - (m[:, None] * x + b[:, None])) <= threshold).sum(axis=1)
+        top = int(inliers.argmax())
+        if inliers[top] > best[0]:
+            best = (int(inliers[top]), float(m[top]), float(b[top]))
+    return best
+
+
+def ransac(x, y, threshold=None, iterations=1000, sample_size=SAMPLE_SIZE, workers=None, seed=None):
+    """RANSAC 回归，返回结果字典
+
+    每次随机取两点确定一条候选直线，统计残差不超过 threshold 的内点数；
+    评分只在至多 sample_size 个随机点上进行，候选直线成批向量化评估，
+    workers > 1 时把迭代分给进程池。最后用最佳直线在全部数据上的内点做最小二乘。
+    threshold 默认先在评分用的点上做 Theil–Sen 初步拟合，取其残差 MAD 的
+    THRESHOLD_SCALE × 1.4826 倍，即约 2.5 倍噪声标准差。
+    """
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 2:
+        raise ValueError("错误：至少需要两个数据点才能计算线性回归。")
+    seeds = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seeds.spawn(1)[0])
+    if n > sample_size:
+        pick = rng.choice(n, sample_size, replace=False)
+        xs, ys = x[pick], y[pick]
+    else:
+        xs, ys = x, y
+    if threshold is None:
+        m0, b0 = theil_sen(xs, ys, seed=rng.integers(1 << 63))
+        residuals = ys - (m0 * xs + b0)
+        threshold = THRESHOLD_SCALE * 1.4826 * float(np.median(np.abs(residuals - np.median(residuals))))
+        if threshold == 0:
+            # 过半的点恰好共线：只容许舍入误差
+            threshold = 1e-9 * max(float(np.abs(ys).max()), 1.0)
+
+    workers = workers or 1
+    shares = [iterations // workers + (w < iterations % workers) for w in range(workers)]
+    tasks = [(xs, ys, threshold, k, s) for k, s in zip(shares, seeds.spawn(workers)) if k]
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_ransac_worker, tasks))
+    else:
+        results = [_ransac_worker(t) for t in tasks]
+    score, m, b = max(results)
+    if score < 2:
+        raise ValueError("错误：没有找到足够的内点，请增大 threshold 或 iterations。")
+
+    mask = np.abs(y - (m * x + b)) <= threshold
+    acc = linear_regression.RegressionAccumulator()
+    acc.update_arrays(x[mask], y[mask])
+    try:
+        m, b = acc.fit()
+    except ValueError:
+        pass
+    return {
+        "slope": m,
+        "intercept": b,
+        "inliers": int(mask.sum()),
+        "inlier_ratio": float(mask.mean()),
+        "threshold": threshold,
+        "iterations": iterations,
+    }
+
+
+def load_points(path, fmt="csv", skip_header=False):
+    """把整个数据文件读成 (x, y) 两个 NumPy 数组；binary 格式直接内存映射"""
+    import numpy as np
+    if fmt == "binary":
+        if os.path.getsize(path) == 0:
+            return np.empty(0), np.empty(0)
+        blocks = list(linear_regression.iter_binary_blocks(path, block_rows=1 << 62))
+    elif fmt == "csv":
+        blocks = list(linear_regression.iter_csv_blocks(path, skip_header=skip_header))
+    else:
+        with open(path, encoding="utf-8") as f:
+            blocks = [(np.array(xs), np.array(ys)) for xs, ys in linear_regression.iter_chunks(f)]
+    if len(blocks) == 1:
+        return blocks[0]
+    if not blocks:
+        return np.empty(0), np.empty(0)
+    return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
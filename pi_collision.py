@@ -1,116 +1,839 @@
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-
-# 用户输入处理
-while True:
-    try:
-        k = int(input("请输入质量比指数 k (建议1-4): "))
-        if k >= 0:
-            break
-        print("请输入非负整数")
-    except ValueError:
-        print("请输入有效整数")
+import os
+import sys
+import csv
+import json
+import math
+import time
+import shutil
+import subprocess
+from array import array
+from bisect import bisect_right
+from decimal import Decimal, ROUND_CEILING, getcontext, localcontext
+from fractions import Fraction
 
 # 物理参数配置
-m1 = 1                   # 小方块质量
-m2 = 100**k              # 大方块质量 (100^k倍)
 width = 20               # 方块宽度
-precision = 1e-12        # 碰撞检测精度阈值
+frame_dt = 1/30          # 每帧对应的模拟时长
 
 # 初始化参数
-x1 = 150.0               # 小方块初始位置
-x2 = 200.0               # 大方块初始位置
-v1 = -5.0                # 小方块初始速度
-v2 = 0.0                 # 大方块初始速度
-wall_pos = 300.0         # 右侧墙壁位置
-collisions = 0           # 碰撞计数器
-
-# 创建图形界面
-fig, ax = plt.subplots(figsize=(12, 6))
-ax.set_xlim(0, wall_pos + 100)
-ax.set_ylim(0, 100)
-ax.set_aspect('equal')
-plt.axis('off')
-
-# 创建图形元素
-wall = plt.Line2D([wall_pos, wall_pos], [0, 100], color='k', lw=3)
-rect1 = plt.Rectangle((x1-width/2, 40), width, 20, color='royalblue', alpha=0.8)
-rect2 = plt.Rectangle((x2-width/2, 40), width, 20, color='crimson', alpha=0.8)
-ax.add_patch(rect1)
-ax.add_patch(rect2)
-ax.add_line(wall)
-
-# 创建信息显示
-info_text = ax.text(20, 85, 
-                   f"质量比: 1 : {100**k}\n碰撞次数: 0\nπ ≈ 0.0000000000",
-                   fontsize=12, 
-                   bbox=dict(facecolor='white', alpha=0.9))
-
-def precise_collision():
-    """精确处理碰撞事件的子函数"""
-    global x1, x2, v1, v2, collisions
-    dt_remaining = 1/30  # 固定每帧持续时间
-    
-    while dt_remaining > precision:
-        # 计算可能的碰撞时间
-        t_block = t_wall = float('inf')
-        
-        # 方块间碰撞检测
-        if v1 > v2:
-            distance = (x2 - width/2) - (x1 + width/2)
-            if distance > 0:
-                t_block = distance / (v1 - v2)
-        
-        # 墙壁碰撞检测
-        if v2 > 0:
-            distance_wall = (wall_pos - width/2) - x2
-            if distance_wall > 0:
-                t_wall = distance_wall / v2
-        
-        # 确定最小时间间隔
-        delta_t = min(t_block, t_wall, dt_remaining)
-        
-        # 更新位置
-        x1 += v1 * delta_t
-        x2 += v2 * delta_t
-        dt_remaining -= delta_t
-        
-        # 处理碰撞事件
-        if delta_t == t_block:
-            # 精确动量守恒计算
-            u1 = ((m1 - m2)/(m1 + m2)) * v1 + (2*m2/(m1 + m2)) * v2
-            u2 = (2*m1/(m1 + m2)) * v1 + ((m2 - m1)/(m1 + m2)) * v2
-            v1, v2 = u1, u2
-            collisions += 1
-        elif delta_t == t_wall:
-            v2 = -v2
+x1_init = 150.0          # 小方块初始位置
+x2_init = 200.0          # 大方块初始位置
+v1_init = 0.0            # 小方块初始速度
+v2_init = -5.0           # 大方块初始速度（向墙壁运动）
+wall_pos = 50.0          # 左侧墙壁位置
+
+
+class CollisionSim:
+    """两方块与墙壁的碰撞模拟状态
+
+    状态全部放在实例里（__slots__ 固定属性，没有 __dict__），
+    不同实例互不影响，可以在同一进程里同时跑多个模拟。
+    """
+
+    __slots__ = ("m1", "m2", "x1", "x2", "v1", "v2", "time", "collisions", "finished")
+
+    def __init__(self, m1, m2, x1=x1_init, x2=x2_init, v1=v1_init, v2=v2_init):
+        self.m1 = m1
+        self.m2 = m2
+        self.x1 = x1
+        self.x2 = x2
+        self.v1 = v1
+        self.v2 = v2
+        self.time = 0.0
+        self.collisions = 0
+        self.finished = False
+
+    def run(self, max_events=None, deadline=None, record=None):
+        """事件驱动地推进模拟，每次直接跳到下一次碰撞时刻
+
+        处理满 max_events 个事件或 time.perf_counter() 超过 deadline 时暂停，
+        下次调用从当前状态继续；record 为 Timeline 时把每个事件追加进去。
+        热循环只读写局部变量，结束时一次性写回实例。返回本次处理的事件数。
+        """
+        if self.finished:
+            return 0
+        inf = float('inf')
+        left = wall_pos + width / 2
+        m1, m2 = self.m1, self.m2
+        c1 = 2 * m2 / (m1 + m2)
+        c2 = 2 * m1 / (m1 + m2)
+        t, x1, x2, v1, v2 = self.time, self.x1, self.x2, self.v1, self.v2
+        limit = inf if max_events is None else max_events
+        deadline = inf if deadline is None else deadline
+        perf_counter = time.perf_counter
+        if record is not None:
+            add_t, add_x1, add_x2 = record.t.append, record.x1.append, record.x2.append
+            add_v1, add_v2 = record.v1.append, record.v2.append
+        done = 0
+        check = 0    # 每 1024 个事件检查一次上限和截止时刻，避免频繁调用计时器
+
+        while True:
+            if done == check:
+                if done >= limit or perf_counter() > deadline:
+                    break
+                check = min(done + 1024, limit)
+            t_block = t_wall = inf
+            if v1 > v2:
+                t_block = max((x2 - x1 - width) / (v1 - v2), 0.0)
+            if v1 < 0:
+                t_wall = max((x1 - left) / -v1, 0.0)
+
+            if t_block <= t_wall:
+                if t_block == inf:
+                    self.finished = True
+                    break
+                t += t_block
+                x1 += v1 * t_block
+                x2 += v2 * t_block
+                # 用相对速度表示的弹性碰撞，质量悬殊时比直接展开更稳定
+                dv = v1 - v2
+                v1 -= c1 * dv
+                v2 += c2 * dv
+            else:
+                t += t_wall
+                x1 += v1 * t_wall
+                x2 += v2 * t_wall
+                v1 = -v1
+            done += 1
+            if record is not None:
+                add_t(t)
+                add_x1(x1)
+                add_x2(x2)
+                add_v1(v1)
+                add_v2(v2)
+
+        self.time, self.x1, self.x2, self.v1, self.v2 = t, x1, x2, v1, v2
+        self.collisions += done
+        return done
+
+
+def headless_collisions(m1, m2, x1=x1_init, x2=x2_init, v1=v1_init, v2=v2_init):
+    """无动画的事件驱动碰撞计数
+
+    返回 (碰撞次数, 小方块末速度, 大方块末速度)
+    """
+    sim = CollisionSim(m1, m2, x1, x2, v1, v2)
+    sim.run()
+    return sim.collisions, sim.v1, sim.v2
+
+
+def closed_form_collisions(m1, m2, speed=-v2_init):
+    """能量圆上的闭式解（小方块初始静止，大方块以 speed 向墙运动）
+
+    在 (√m1·v1, √m2·v2) 平面上每两次碰撞相当于旋转 2θ，
+    θ = arctan(√(m1/m2))，因此碰撞次数为 ⌈π/θ⌉ - 1。
+    返回 (碰撞次数, 小方块末速度, 大方块末速度)
+    """
+    theta = math.atan(math.sqrt(m1 / m2))
+    collisions = math.ceil(math.pi / theta) - 1
+    phi = (collisions + 1) * theta if collisions % 2 else -collisions * theta
+    v1 = -speed * math.sqrt(m2 / m1) * math.sin(phi)
+    v2 = -speed * math.cos(phi)
+    return collisions, v1, v2
+
+
+def rational_collisions(m1, m2, x1=x1_init, x2=x2_init, v1=v1_init, v2=v2_init):
+    """精确有理数事件循环
+
+    两个速度写成 A/D、B/D 共用一个分母，碰撞时只做整数乘加，
+    不做逐步约分；碰撞顺序只取决于速度，位置仅用于判断第一次碰撞。
+    返回 (碰撞次数, 小方块末速度, 大方块末速度)，速度为 Fraction
+    """
+    m1, m2 = Fraction(m1), Fraction(m2)
+    v1, v2 = Fraction(v1), Fraction(v2)
+    # 质量同乘公分母化为整数，不影响碰撞结果
+    scale = m1.denominator * m2.denominator
+    m1, m2 = int(m1 * scale), int(m2 * scale)
+    den = v1.denominator * v2.denominator
+    a = v1.numerator * v2.denominator
+    b = v2.numerator * v1.denominator
+    total, diff = m1 + m2, m1 - m2
+    collisions = 0
+
+    # 小方块同时靠近墙和大方块时，由位置决定先撞哪一个
+    if b < a < 0:
+        gap = Fraction(x2) - Fraction(x1) - width
+        gap_wall = Fraction(x1) - wall_pos - Fraction(width, 2)
+        if gap_wall * (v1 - v2) < gap * -v1:
+            a = -a
             collisions += 1
 
-def update(frame):
-    """动画更新函数"""
-    precise_collision()
-    
-    # 更新方块位置
-    rect1.set_x(x1 - width/2)
-    rect2.set_x(x2 - width/2)
-    
-    # 计算圆周率近似值
-    pi_approx = collisions / (10**k)
-    
-    # 更新信息显示
-    info_text.set_text(
+    while True:
+        if a > b:
+            a, b = diff * a + 2 * m2 * b, 2 * m1 * a - diff * b
+            den *= total
+        elif a < 0:
+            a = -a
+        else:
+            break
+        collisions += 1
+
+    return collisions, Fraction(a, den), Fraction(b, den)
+
+
+def _atan_decimal(x):
+    """当前 decimal 精度下的 arctan(x)，x ≥ 0"""
+    # 半角公式把参数压到 0.1 以下，级数收敛更快
+    halvings = 0
+    while x > Decimal("0.1"):
+        x = x / (1 + (1 + x * x).sqrt())
+        halvings += 1
+    eps = Decimal(10) ** -(getcontext().prec + 2)
+    x2 = x * x
+    term = x
+    result = x
+    i = 1
+    while abs(term) > eps:
+        term *= -x2
+        i += 2
+        result += term / i
+    return result * 2**halvings
+
+
+def _sin_cos_decimal(x):
+    """当前 decimal 精度下的 (sin x, cos x)，适用于较小的 x"""
+    eps = Decimal(10) ** -(getcontext().prec + 2)
+    sin = term = x
+    cos = 1
+    i = 1
+    while abs(term) > eps:
+        term = -term * x / (i + 1)
+        cos += term
+        term = term * x / (i + 2)
+        sin += term
+        i += 2
+    return sin, cos
+
+
+def rotation_collisions(m1, m2, speed=-v2_init):
+    """能量圆旋转形式的精确计数（小方块初始静止）
+
+    碰撞次数 N = ⌈π/θ⌉ - 1 只取决于 π/θ 的整数部分，
+    用 decimal 高精度计算并检查误差，精度不够时自动加倍，
+    因此对任意 k 都精确，耗时与碰撞次数无关。
+    返回 (碰撞次数, 小方块末速度, 大方块末速度)
+    """
+    ratio = Fraction(m1) / Fraction(m2)
+    digits = len(str(int(1 / ratio))) // 2 + 1
+    prec = digits + 30
+    while True:
+        with localcontext() as ctx:
+            ctx.prec = prec
+            pi = 16 * _atan_decimal(Decimal(1) / 5) - 4 * _atan_decimal(Decimal(1) / 239)
+            theta = _atan_decimal((Decimal(ratio.numerator) / ratio.denominator).sqrt())
+            turns = pi / theta
+            nearest = turns.to_integral_value()
+            # 与最近整数的距离大于误差上界时，向上取整的结果可信；
+            # 精度加到上限仍分不开说明 π/θ 恰为整数（如等质量）
+            exact = abs(turns - nearest) <= turns.scaleb(20 - prec)
+            if not exact or prec > 8 * (digits + 30):
+                ceiling = nearest if exact else turns.to_integral_value(rounding=ROUND_CEILING)
+                collisions = int(ceiling) - 1
+                steps = collisions + 1 if collisions % 2 else -collisions
+                # 终态角度落在 π 附近，只需对小偏移量 δ 求三角函数
+                delta = steps * theta % (2 * pi) - pi
+                sin_delta, cos_delta = _sin_cos_decimal(delta)
+                v1 = speed * float((Decimal(ratio.denominator) / ratio.numerator).sqrt() * sin_delta)
+                v2 = speed * float(cos_delta)
+                break
+        prec *= 2
+
+    return collisions, v1, v2
+
+
+# 可选的计算后端
+BACKENDS = {
+    "float": headless_collisions,
+    "closed-form": closed_form_collisions,
+    "rational": rational_collisions,
+    "rotation": rotation_collisions,
+}
+
+
+def count_collisions(m1, m2, backend="float"):
+    """按指定后端计算默认初始状态下的碰撞，返回 (碰撞次数, v1, v2)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"未知后端: {backend}，可选 {', '.join(BACKENDS)}")
+    return BACKENDS[backend](m1, m2)
+
+
+def format_pi(collisions, k):
+    """把碰撞次数写成 π 的前 k+1 位有效数字"""
+    digits = str(collisions)
+    return f"{digits[0]}.{digits[1:]}" if k else digits
+
+
+def run_headless(k, backend="float"):
+    """命令行模式：直接输出质量比 100^k 的碰撞结果"""
+    m1, m2 = 1, 100**k
+    start = time.perf_counter()
+    collisions, v1, v2 = count_collisions(m1, m2, backend)
+    elapsed = time.perf_counter() - start
+
+    print(f"质量比: 1 : {m2}")
+    print(f"碰撞次数: {collisions}")
+    print(f"π ≈ {format_pi(collisions, k)}")
+    print(f"末速度: v1 = {float(v1):.6f}, v2 = {float(v2):.6f}")
+    print(f"用时: {elapsed:.3f} 秒")
+
+
+def batch_collisions(m1, m2, x1=x1_init, x2=x2_init, v1=v1_init, v2=v2_init):
+    """用 NumPy 数组同时推进多组系统
+
+    参数可以是标量或可广播的数组，每一轮循环所有未结束的系统
+    各自推进到下一次碰撞；结束的系统及时从工作数组中移除。
+    返回 (碰撞次数, 小方块末速度, 大方块末速度) 三个数组
+    """
+    import numpy as np
+
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (m1, m2, x1, x2, v1, v2)))
+    shape = arrays[0].shape
+    m1, m2, x1, x2, v1, v2 = (a.ravel().copy() for a in arrays)
+    c1 = 2 * m2 / (m1 + m2)
+    c2 = 2 * m1 / (m1 + m2)
+    left = wall_pos + width / 2
+
+    counts = np.zeros(m1.size, dtype=np.int64)
+    final_v1 = np.empty(m1.size)
+    final_v2 = np.empty(m1.size)
+    active = np.arange(m1.size)
+    n = np.zeros(m1.size, dtype=np.int64)
+
+    while active.size:
+        rel = v1 - v2
+        block = rel > 0
+        wall = v1 < 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_block = np.where(block, np.maximum(x2 - x1 - width, 0.0) / rel, np.inf)
+            t_wall = np.where(wall, np.maximum(x1 - left, 0.0) / -v1, np.inf)
+        hit_block = block & (t_block <= t_wall)
+        hit_wall = wall & ~hit_block
+        done = ~(hit_block | hit_wall)
+
+        dt = np.where(done, 0.0, np.minimum(t_block, t_wall))
+        x1 += v1 * dt
+        x2 += v2 * dt
+        dv = np.where(hit_block, rel, 0.0)
+        v1 = np.where(hit_wall, -v1, v1 - c1 * dv)
+        v2 += c2 * dv
+        n += ~done
+
+        if done.any():
+            finished = active[done]
+            counts[finished] = n[done]
+            final_v1[finished] = v1[done]
+            final_v2[finished] = v2[done]
+            keep = ~done
+            active = active[keep]
+            x1, x2, v1, v2, c1, c2, n = (a[keep] for a in (x1, x2, v1, v2, c1, c2, n))
+
+    return counts.reshape(shape), final_v1.reshape(shape), final_v2.reshape(shape)
+
+
+def run_batch(ks, ratios=(), v1s=(v1_init,), x1s=(x1_init,)):
+    """批量模式：对所有质量比与初始条件的组合打印碰撞次数表"""
+    import numpy as np
+
+    labels = [f"100^{k}" for k in ks] + [f"{r:g}" for r in ratios]
+    masses = [float(100**k) for k in ks] + [float(r) for r in ratios]
+    grid = np.array([(m, v, x) for m in masses for v in v1s for x in x1s]).reshape(-1, 3)
+    if not grid.size:
+        print("没有需要计算的组合")
+        return
+
+    start = time.perf_counter()
+    counts, final_v1, final_v2 = batch_collisions(1.0, grid[:, 0], x1=grid[:, 2], v1=grid[:, 1])
+    elapsed = time.perf_counter() - start
+
+    print(f"{'质量比':>12} {'v1':>8} {'x1':>8} {'碰撞次数':>12} {'末速度 v1':>12} {'末速度 v2':>12}")
+    configs = ((label, v, x) for label in labels for v in v1s for x in x1s)
+    for (label, v, x), n, u1, u2 in zip(configs, counts, final_v1, final_v2):
+        print(f"{label:>15} {v:>8g} {x:>8g} {n:>16} {u1:>15.6f} {u2:>15.6f}")
+    print(f"共 {len(grid)} 组，用时 {elapsed:.3f} 秒")
+
+
+# 扫描结果的输出字段
+SWEEP_FIELDS = ["ratio", "v1", "x1", "backend", "collisions", "v1_final", "v2_final", "seconds"]
+
+
+def sweep_task(config):
+    """扫描子进程执行的单组计算，不涉及任何绘图"""
+    backend = config["backend"]
+    start = time.perf_counter()
+    if backend in ("float", "rational"):
+        collisions, v1, v2 = BACKENDS[backend](1, config["m2"], x1=config["x1"], v1=config["v1"])
+    else:
+        collisions, v1, v2 = BACKENDS[backend](1, config["m2"])
+    return {
+        "ratio": config["ratio"],
+        "v1": config["v1"],
+        "x1": config["x1"],
+        "backend": backend,
+        "collisions": collisions,
+        "v1_final": float(v1),
+        "v2_final": float(v2),
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+
+
+def _sweep_key(row):
+    """用于断点续跑的配置标识"""
+    return str(row["ratio"]), float(row["v1"]), float(row["x1"]), str(row["backend"])
+
+
+def _load_finished(path, is_csv):
+    """读取已写入的结果，截掉中断时写了一半的最后一行"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+            data = data[:end]
+    lines = data.decode("utf-8").splitlines()
+    if is_csv:
+        rows = list(csv.DictReader(lines))
+    else:
+        rows = [json.loads(line) for line in lines if line.strip()]
+    return {_sweep_key(row) for row in rows}
+
+
+def run_sweep(ks, ratios, v1s, x1s, backend, output, workers=None):
+    """多进程参数扫描：按预计耗时从长到短调度，结果边算边写入 CSV/JSONL
+
+    输出文件已存在时跳过其中已完成的配置，从中断处继续。
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    masses = [(f"100^{k}", 100**k) for k in ks] + [(f"{r:g}", r) for r in ratios]
+    configs = [{"ratio": label, "m2": m2, "v1": float(v), "x1": float(x), "backend": backend}
+               for label, m2 in masses for v in v1s for x in x1s]
+
+    is_csv = output.lower().endswith(".csv")
+    finished = _load_finished(output, is_csv)
+    pending = [c for c in configs if _sweep_key(c) not in finished]
+    # 碰撞次数约为 π·√(m2/m1)，大质量比的任务先提交，避免最后只剩一个核在跑
+    pending.sort(key=lambda c: c["m2"], reverse=True)
+    print(f"共 {len(configs)} 组，已完成 {len(configs) - len(pending)} 组，待计算 {len(pending)} 组")
+
+    start = time.perf_counter()
+    with open(output, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SWEEP_FIELDS) if is_csv else None
+        if is_csv and f.tell() == 0:
+            writer.writeheader()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(sweep_task, c) for c in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                row = future.result()
+                if is_csv:
+                    writer.writerow(row)
+                else:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                f.flush()
+                print(f"[{done}/{len(pending)}] 质量比 {row['ratio']} v1={row['v1']:g} x1={row['x1']:g}: "
+                      f"碰撞次数 {row['collisions']}，用时 {row['seconds']:.3f} 秒")
+    print(f"扫描结束，用时 {time.perf_counter() - start:.3f} 秒，结果已写入 {output}")
+
+
+class Timeline:
+    """碰撞事件时间线
+
+    第 i 个事件记录第 i 次碰撞的时刻、两方块位置和碰撞后速度
+    （第 0 个事件为初始状态），全部存放在紧凑的 array('d') 中。
+    回放时只在相邻事件之间线性插值，快进、拖动、跳转都无需重新模拟。
+    """
+
+    def __init__(self, m1, m2, x1=x1_init, x2=x2_init, v1=v1_init, v2=v2_init):
+        self.sim = CollisionSim(m1, m2, x1, x2, v1, v2)
+        self.t = array('d', [0.0])
+        self.x1 = array('d', [x1])
+        self.x2 = array('d', [x2])
+        self.v1 = array('d', [v1])
+        self.v2 = array('d', [v2])
+        self.events_per_second = 0.0    # 最近一次 extend 的计算速度
+
+    @property
+    def finished(self):
+        """是否已经算到不再发生碰撞"""
+        return self.sim.finished
+
+    @property
+    def collisions(self):
+        """时间线中的碰撞总次数"""
+        return len(self.t) - 1
+
+    @property
+    def end_time(self):
+        """最后一次碰撞的时刻"""
+        return self.t[-1]
+
+    def extend(self, budget=None):
+        """从最后一个事件继续模拟
+
+        budget 为本次最多占用的秒数，用完后停在当前事件，
+        下次调用从这里接着算；为 None 时一直算到不再发生碰撞。
+        返回本次新增的事件数。
+        """
+        start = time.perf_counter()
+        added = self.sim.run(deadline=None if budget is None else start + budget, record=self)
+        elapsed = time.perf_counter() - start
+        if added and elapsed > 0:
+            self.events_per_second = added / elapsed
+        return added
+
+    def state_at(self, time):
+        """插值得到时刻 time 的 (x1, x2, 已发生的碰撞次数)"""
+        i = max(bisect_right(self.t, time) - 1, 0)
+        dt = time - self.t[i]
+        return self.x1[i] + self.v1[i] * dt, self.x2[i] + self.v2[i] * dt, i
+
+    def collision_rate(self, time, window=1.0):
+        """时刻 time 之前 window 秒内的平均碰撞频率（次/秒）"""
+        return (bisect_right(self.t, time) - bisect_right(self.t, time - window)) / window
+
+
+def ask_k():
+    """用户输入处理"""
+    while True:
+        try:
+            k = int(input("请输入质量比指数 k (建议1-4): "))
+            if k >= 0:
+                return k
+            print("请输入非负整数")
+        except ValueError:
+            print("请输入有效整数")
+
+
+def info_label(k, collisions):
+    """信息框中的文字"""
+    return (
         f"质量比: 1 : {100**k}\n"
         f"碰撞次数: {collisions}\n"
-        f"π ≈ {pi_approx:.10f}"
+        f"π ≈ {collisions / 10**k:.10f}"
     )
-    
-    # 停止条件：当不再可能发生碰撞时
-    if v1 <= v2 and (x1 + width/2) < (x2 - width/2):
-        ani.event_source.stop()
-        print(f"\n模拟结束，最终结果:\n碰撞次数: {collisions}\nπ近似值: {pi_approx:.10f}")
-    
-    return rect1, rect2, info_text
-
-# 创建并启动动画
-ani = animation.FuncAnimation(fig, update, interval=30, blit=True)
-plt.show()
+
+
+class PhasePlot:
+    """相空间图：以 (√m1·v1, √m2·v2) 为坐标画出每次碰撞后的状态折线
+
+    动能守恒使所有顶点落在同一个圆上。顶点存放在预先分配的 (容量, 2) NumPy 缓冲区中，
+    新事件直接写入缓冲区（容量不足时翻倍），折线始终是同一个 Line2D，
+    只用 set_data 传入缓冲区前缀的视图，十万个以上的碰撞点也不必逐个创建图形元素。
+    """
+
+    def __init__(self, ax, m1, m2, v1=v1_init, v2=v2_init, capacity=1024):
+        import numpy as np
+        import matplotlib.pyplot as plt
+
+        self.scale = np.array([math.sqrt(m1), math.sqrt(m2)])
+        self.buffer = np.empty((max(capacity, 1), 2))
+        self.count = 0          # 缓冲区中已写入的顶点数
+        self.shown = -1         # 当前显示的顶点数
+
+        radius = math.hypot(self.scale[0] * v1, self.scale[1] * v2)
+        limit = 1.1 * radius if radius > 0 else 1.0
+        ax.set_xlim(-limit, limit)
+        ax.set_ylim(-limit, limit)
+        ax.set_aspect('equal')
+        ax.set_xlabel("√m1 · v1")
+        ax.set_ylabel("√m2 · v2")
+        ax.set_title("相空间")
+        ax.add_patch(plt.Circle((0, 0), radius, fill=False, color='0.7', ls='--'))
+        self.line, = ax.plot([], [], color='purple', lw=0.6)
+        self.point, = ax.plot([], [], 'o', color='crimson', ms=4)
+
+    def sync(self, timeline):
+        """把时间线中尚未写入缓冲区的事件追加进去"""
+        import numpy as np
+        start, stop = self.count, len(timeline.t)
+        if stop <= start:
+            return
+        if stop > len(self.buffer):
+            grown = np.empty((max(stop, 2 * len(self.buffer)), 2))
+            grown[:start] = self.buffer[:start]
+            self.buffer = grown
+        # 先切出新的 array 再转换，不在时间线的 array 上保留缓冲区导出，避免它无法继续增长
+        self.buffer[start:stop, 0] = np.frombuffer(timeline.v1[start:stop])
+        self.buffer[start:stop, 1] = np.frombuffer(timeline.v2[start:stop])
+        self.buffer[start:stop] *= self.scale
+        self.count = stop
+
+    def show(self, collisions):
+        """显示初始状态和前 collisions 次碰撞后的状态，返回需要重绘的图形元素"""
+        shown = min(collisions + 1, self.count)
+        if shown != self.shown:
+            self.shown = shown
+            vertices = self.buffer[:shown]
+            self.line.set_data(vertices[:, 0], vertices[:, 1])
+            self.point.set_data(vertices[-1:, 0], vertices[-1:, 1])
+        return self.line, self.point
+
+
+def create_scene(k, phase=False):
+    """创建墙壁、两个方块和信息框，返回 (fig, ax, rect1, rect2, info_text, phase_plot)
+
+    phase 为 True 时在右侧再加一幅相空间图，否则 phase_plot 为 None。
+    """
+    import matplotlib.pyplot as plt
+
+    if phase:
+        fig, (ax, phase_ax) = plt.subplots(1, 2, figsize=(16, 6), gridspec_kw={"width_ratios": [2, 1]})
+    else:
+        fig, ax = plt.subplots(figsize=(12, 6))
+    ax.set_xlim(wall_pos - 50, wall_pos + 350)
+    ax.set_ylim(0, 100)
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+    # 创建图形元素
+    wall = plt.Line2D([wall_pos, wall_pos], [0, 100], color='k', lw=3)
+    rect1 = plt.Rectangle((x1_init-width/2, 40), width, 20, color='royalblue', alpha=0.8)
+    rect2 = plt.Rectangle((x2_init-width/2, 40), width, 20, color='crimson', alpha=0.8)
+    ax.add_patch(rect1)
+    ax.add_patch(rect2)
+    ax.add_line(wall)
+
+    # 创建信息显示
+    info_text = ax.text(wall_pos + 20, 85, info_label(k, 0), fontsize=12,
+                        bbox=dict(facecolor='white', alpha=0.9))
+    phase_plot = PhasePlot(phase_ax, 1, 100**k) if phase else None
+    return fig, ax, rect1, rect2, info_text, phase_plot
+
+
+def export_video(k, path, fps=30, speed=1.0, dpi=100):
+    """离屏渲染整段动画并导出为 MP4/GIF
+
+    使用 Agg 后端绘制，每帧的 RGBA 像素直接通过管道写给 ffmpeg，
+    内存中只保留最近一帧；画面没有可见变化（方块像素位置和碰撞次数都不变）
+    时跳过重绘，直接重复发送上一帧。
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+    ffmpeg = shutil.which(matplotlib.rcParams["animation.ffmpeg_path"])
+    if ffmpeg is None:
+        raise RuntimeError("未找到 ffmpeg，请先安装或设置 rcParams['animation.ffmpeg_path']")
+
+    timeline = Timeline(1, 100**k)
+    timeline.extend()
+    end = timeline.end_time + 2.0
+    frames = math.ceil(end * fps / speed) + 1
+
+    fig, ax, rect1, rect2, info_text, _ = create_scene(k)
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    w, h = fig.canvas.get_width_height()
+
+    if path.lower().endswith(".gif"):
+        # 逐帧生成调色板，ffmpeg 不必缓存全部帧
+        codec = ["-vf", "split[a][b];[a]palettegen=stats_mode=single[p];[b][p]paletteuse=new=1"]
+    else:
+        codec = ["-vcodec", "libx264", "-pix_fmt", "yuv420p"]
+    cmd = [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+           "-s", f"{w}x{h}", "-r", str(fps), "-i", "-", *codec, path]
+
+    to_px = ax.transData.transform
+    lo, hi = ax.get_xlim()
+    last_key = frame = None
+    rendered = 0
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    broken = False
+    try:
+        for i in range(frames):
+            x1, x2, collisions = timeline.state_at(i * speed / fps)
+            # 移出画面的方块位置截断到边界外，不再算作变化
+            left1, left2 = (min(max(x - width/2, lo - width), hi) for x in (x1, x2))
+            px = to_px([(left1, 0), (left2, 0)])[:, 0].round()
+            key = (px[0], px[1], collisions)
+            if key != last_key:
+                last_key = key
+                rect1.set_x(x1 - width/2)
+                rect2.set_x(x2 - width/2)
+                info_text.set_text(info_label(k, collisions))
+                fig.canvas.draw()
+                frame = bytes(fig.canvas.buffer_rgba())
+                rendered += 1
+            proc.stdin.write(frame)
+    except OSError:
+        # ffmpeg 提前退出（缺少编码器、输出路径无效等）时管道断开，下面按退出码报错
+        broken = True
+    finally:
+        try:
+            proc.stdin.close()
+        except OSError:
+            broken = True
+        proc.wait()
+    if proc.returncode:
+        raise RuntimeError(f"ffmpeg 退出码 {proc.returncode}")
+    if broken:
+        raise RuntimeError("ffmpeg 提前关闭了输入管道")
+    print(f"已导出 {path}: {frames} 帧（实际绘制 {rendered} 帧），用时 {time.perf_counter() - start:.1f} 秒")
+
+
+class Player:
+    """交互式回放：时间线、图形元素和播放状态"""
+
+    def __init__(self, k, budget=None, phase=True):
+        import matplotlib.animation as animation
+        from matplotlib.widgets import Slider
+
+        self.k = k
+        self.budget = budget
+        # 碰撞事件时间线：有时间预算时边播放边计算，否则预先算完
+        self.timeline = Timeline(1, 100**k)
+        if budget is None:
+            start = time.perf_counter()
+            self.timeline.extend()
+            print(f"时间线生成完毕: {self.timeline.collisions} 次碰撞，用时 {time.perf_counter() - start:.3f} 秒")
+        self.sim_time = 0.0          # 当前回放时刻
+        self.speed = 1.0             # 回放倍速
+        self.paused = False
+        self.shown_collisions = -1
+        self.reported = False
+
+        # 创建图形界面
+        self.fig, self.ax, self.rect1, self.rect2, self.info_text, self.phase = create_scene(k, phase)
+        if self.phase is not None:
+            self.phase.sync(self.timeline)
+        self.time_text = self.ax.text(wall_pos + 20, 5, "", fontsize=10)
+
+        # 时间轴与键盘控制
+        slider_ax = self.fig.add_axes([0.15, 0.08, 0.7, 0.03])
+        self.slider = Slider(slider_ax, "时间", 0.0, max(self.playback_end(), frame_dt), valinit=0.0)
+        self.slider.on_changed(self.on_scrub)
+        self.fig.canvas.mpl_connect('key_press_event', self.on_key)
+
+        # 创建并启动动画
+        self.ani = animation.FuncAnimation(self.fig, self.update, interval=30, blit=True,
+                                           cache_frame_data=False)
+
+    def playback_end(self):
+        """当前可以播放到的时刻：时间线未算完时只能到最后一个已知事件"""
+        timeline = self.timeline
+        return timeline.end_time + 2.0 if timeline.finished else timeline.end_time
+
+    def update(self, frame):
+        """动画更新函数：按时间预算续算时间线，再在时间线上插值"""
+        timeline = self.timeline
+        if not timeline.finished:
+            timeline.extend(self.budget)
+            if self.phase is not None:
+                self.phase.sync(timeline)
+            # 算完或每隔约一秒更新一次时间轴范围
+            if timeline.finished or frame % 30 == 0:
+                self.slider.valmax = max(self.playback_end(), frame_dt)
+                self.slider.ax.set_xlim(0.0, self.slider.valmax)
+                self.fig.canvas.draw_idle()
+
+        end = self.playback_end()
+        if not self.paused:
+            self.sim_time = min(self.sim_time + self.speed * frame_dt, end)
+        x1, x2, collisions = timeline.state_at(self.sim_time)
+
+        # 更新方块位置
+        self.rect1.set_x(x1 - width/2)
+        self.rect2.set_x(x2 - width/2)
+
+        # 碰撞次数变化时才重新排版信息文字
+        if collisions != self.shown_collisions:
+            self.shown_collisions = collisions
+            self.info_text.set_text(info_label(self.k, collisions))
+        status = "" if timeline.finished else f"  计算中 {timeline.events_per_second:,.0f} 事件/秒"
+        self.time_text.set_text(
+            f"t = {self.sim_time:.2f} / {end:.2f}  倍速 ×{self.speed:g}" + ("  暂停" if self.paused else "") + "\n"
+            f"碰撞频率 {timeline.collision_rate(self.sim_time):,.0f} 次/秒{status}"
+        )
+
+        # 播放到最后一次碰撞之后输出结果
+        if timeline.finished and self.sim_time >= end and not self.reported:
+            self.reported = True
+            print(f"\n模拟结束，最终结果:\n碰撞次数: {collisions}\nπ近似值: {collisions / 10**self.k:.10f}")
+
+        artists = (self.rect1, self.rect2, self.info_text, self.time_text)
+        if self.phase is not None:
+            artists += self.phase.show(collisions)
+        return artists
+
+    def on_key(self, event):
+        """键盘控制：空格暂停，←/→ 跳转，↑/↓ 调整倍速，Home/End 跳到首尾"""
+        if event.key == ' ':
+            self.paused = not self.paused
+        elif event.key == 'up':
+            self.speed *= 2
+        elif event.key == 'down':
+            self.speed /= 2
+        elif event.key in ('left', 'right', 'home', 'end'):
+            end = self.playback_end()
+            step = end / 20
+            target = {'left': self.sim_time - step, 'right': self.sim_time + step,
+                      'home': 0.0, 'end': end}[event.key]
+            self.slider.set_val(min(max(target, 0.0), end))
+
+    def on_scrub(self, value):
+        """拖动时间轴时直接跳到对应时刻（不超过已算出的部分）"""
+        self.sim_time = min(value, self.playback_end())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="方块碰撞计算圆周率")
+    parser.add_argument("--headless", type=int, metavar="K",
+                        help="不显示动画，直接计算质量比 100^K 的碰撞次数")
+    parser.add_argument("--backend", choices=BACKENDS, default="float",
+                        help="配合 --headless/--sweep 选择计算后端 (默认 float)")
+    parser.add_argument("--batch", type=int, nargs="*", metavar="K",
+                        help="批量计算多个质量比 100^K，不显示动画")
+    parser.add_argument("--sweep", type=int, nargs="*", metavar="K",
+                        help="多进程扫描多个质量比 100^K，结果写入 --output")
+    parser.add_argument("--ratio", type=float, nargs="+", default=[], metavar="R",
+                        help="配合 --batch/--sweep 追加任意质量比 m2/m1")
+    parser.add_argument("--v1", type=float, nargs="+", default=[v1_init],
+                        help="配合 --batch/--sweep 指定小方块初始速度")
+    parser.add_argument("--x1", type=float, nargs="+", default=[x1_init],
+                        help="配合 --batch/--sweep 指定小方块初始位置")
+    parser.add_argument("--export", type=int, metavar="K",
+                        help="不打开窗口，把质量比 100^K 的动画导出为 --output 指定的 MP4/GIF")
+    parser.add_argument("--output",
+                        help="--sweep 的输出文件 (.csv/.jsonl，默认 pi_sweep.jsonl)，"
+                             "或 --export 的视频文件 (.mp4/.gif，默认 pi_collision_K.mp4)")
+    parser.add_argument("--fps", type=int, default=30, help="配合 --export 指定帧率 (默认 30)")
+    parser.add_argument("--speed", type=float, default=1.0, help="配合 --export 指定播放倍速 (默认 1)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="配合 --sweep 指定进程数 (默认 CPU 核数)")
+    parser.add_argument("--budget", type=float, default=15.0, metavar="MS",
+                        help="动画每帧用于计算碰撞的时间预算，毫秒 (默认 15，0 表示先全部算完)")
+    parser.add_argument("--no-phase", action="store_true", help="动画中不显示相空间图")
+    args = parser.parse_args()
+
+    if args.batch is not None:
+        run_batch(args.batch, args.ratio, args.v1, args.x1)
+        sys.exit()
+
+    if args.sweep is not None:
+        if args.backend in ("closed-form", "rotation") and any(args.v1):
+            parser.error(f"{args.backend} 后端只支持小方块初始静止 (--v1 0)")
+        run_sweep(args.sweep, args.ratio, args.v1, args.x1, args.backend,
+                  args.output or "pi_sweep.jsonl", args.workers)
+        sys.exit()
+
+    if args.export is not None:
+        try:
+            export_video(args.export, args.output or f"pi_collision_{args.export}.mp4", args.fps, args.speed)
+        except RuntimeError as e:
+            print(f"导出失败: {e}")
+            sys.exit(1)
+        sys.exit()
+
+    if args.headless is not None:
+        if args.headless < 0:
+            parser.error("K 必须为非负整数")
+        run_headless(args.headless, args.backend)
+        sys.exit()
+
+    import matplotlib.pyplot as plt
+
+    player = Player(ask_k(), args.budget / 1000 if args.budget > 0 else None, not args.no_phase)
+    plt.show()
@@ -0,0 +1,141 @@
+import sys
+import json
+import time
+import platform
+import tracemalloc
+
+import pi_collision
+
+# π 的前若干位，用于校验碰撞次数
+PI_DIGITS = "314159265358979323846264338327950288"
+
+
+def _float_engine(k):
+    return pi_collision.headless_collisions(1, 100**k)[0]
+
+
+def _timeline_engine(k):
+    timeline = pi_collision.Timeline(1, 100**k)
+    timeline.extend()
+    return timeline.collisions
+
+
+def _rational_engine(k):
+    return pi_collision.rational_collisions(1, 100**k)[0]
+
+
+def _rotation_engine(k):
+    return pi_collision.rotation_collisions(1, 100**k)[0]
+
+
+# 引擎名称 -> (计算函数, 默认测试的最大 k)
+ENGINES = {
+    "float": (_float_engine, 7),
+    "timeline": (_timeline_engine, 6),
+    "rational": (_rational_engine, 4),
+    "rotation": (_rotation_engine, 7),
+}
+
+
+def measure(engine, k, repeat=1, memory=True):
+    """运行一次基准，返回结果字典
+
+    用时取 repeat 次中的最小值；峰值内存另外单独跑一次，
+    避免 tracemalloc 的开销影响计时。
+    """
+    func = ENGINES[engine][0]
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        collisions = func(k)
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func(k)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "engine": engine,
+        "k": k,
+        "collisions": collisions,
+        "correct": str(collisions) == PI_DIGITS[:k + 1],
+        "seconds": round(best, 6),
+        "events_per_second": round(collisions / best) if best > 0 else None,
+        "peak_memory_kb": None if peak is None else round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance, min_seconds=0.01):
+    """与基线对比，返回事件速度下降超过 tolerance 的项
+
+    用时不足 min_seconds 的项计时噪声太大，不参与比较。
+    """
+    old = {(r["engine"], r["k"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        base = old.get((r["engine"], r["k"]))
+        if not base or not base["events_per_second"] or not r["events_per_second"]:
+            continue
+        if min(base["seconds"], r["seconds"]) < min_seconds:
+            continue
+        change = r["events_per_second"] / base["events_per_second"] - 1
+        if change < -tolerance:
+            regressions.append((r, change))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="pi_collision 碰撞引擎基准测试")
+    parser.add_argument("--k-max", type=int, default=7, help="测试的最大 k (默认 7，各引擎另有上限)")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES),
+                        help="要测试的引擎 (默认全部)")
+    parser.add_argument("--repeat", type=int, default=1, help="每项重复次数，取最快一次 (默认 1)")
+    parser.add_argument("--no-memory", action="store_true", help="不测量峰值内存")
+    parser.add_argument("--output", default="pi_collision_bench.json", help="结果 JSON 文件 (默认 pi_collision_bench.json)")
+    parser.add_argument("--baseline", help="与之前保存的结果 JSON 对比")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="事件速度允许下降的比例，超过视为退化 (默认 0.2)")
+    args = parser.parse_args()
+
+    print(f"{'引擎':>8} {'k':>3} {'碰撞次数':>12} {'用时(秒)':>10} {'事件/秒':>12} {'峰值内存(KB)':>12} {'π':>3}")
+    results = []
+    for engine in args.engines:
+        for k in range(1, min(args.k_max, ENGINES[engine][1]) + 1):
+            r = measure(engine, k, args.repeat, not args.no_memory)
+            results.append(r)
+            eps = "-" if r["events_per_second"] is None else f"{r['events_per_second']:,}"
+            mem = "-" if r["peak_memory_kb"] is None else f"{r['peak_memory_kb']:,.1f}"
+            print(f"{engine:>10} {k:>3} {r['collisions']:>16} {r['seconds']:>12.4f} {eps:>15} {mem:>16} "
+                  f"{'✓' if r['correct'] else '✗':>3}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {args.output}")
+
+    failed = [r for r in results if not r["correct"]]
+    for r in failed:
+        print(f"错误: {r['engine']} 引擎 k={r['k']} 的碰撞次数 {r['collisions']} 与 π 不符")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r, change in regressions:
+            print(f"性能退化: {r['engine']} 引擎 k={r['k']} 事件速度下降 {-change:.0%}")
+        if not regressions:
+            print(f"与基线 {args.baseline} 相比没有超过 {args.tolerance:.0%} 的退化")
+
+    if failed or regressions:
+        sys.exit(1)
+